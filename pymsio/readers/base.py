@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Union, List, Sequence
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Union, List, Sequence, NamedTuple, Tuple, Optional
 from pathlib import Path
 
 from tqdm import tqdm
@@ -9,11 +11,15 @@ import numpy as np
 from pymsio.readers.ms_data import (
     MassSpecData,
     PeakArray,
+    PeakArrayBuilder,
     META_SCHEMA,
+    concat_peak_arrays,
 )  # noqa: F401 (re-export)
 
 COMPRESSION_EXTENSIONS = [".gz", ".zip", ".bz2", ".xz", ".7z", ".tar"]
 MS_EXTENSIONS = [".mzml", ".raw", ".d", ".wiff", ".mgf", ".mzdata", ".mz5"]
+_COMPRESSION_EXT_SET = frozenset(COMPRESSION_EXTENSIONS)
+_MS_EXT_SET = frozenset(MS_EXTENSIONS)
 
 
 class _ProgressIterWrapper:
@@ -35,9 +41,19 @@ class _ProgressIterWrapper:
         return getattr(self._it, "__length_hint__", lambda: 0)()
 
 
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
 class MassSpecFileReader(ABC):
 
     meta_schema = META_SCHEMA
+    # frames kept by get_frame/get_frames (LRU); off by default, set e.g.
+    # ``reader.frame_cache_size = 256`` to enable. Cached frames are read-only.
+    frame_cache_size = 0
 
     def __init__(
         self,
@@ -49,6 +65,9 @@ class MassSpecFileReader(ABC):
             raise FileNotFoundError(f"File not found: {file_path}")
         self.file_path = file_path
         self.num_workers = num_workers
+        self._frame_cache: "OrderedDict[int, PeakArray]" = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
 
     def _progress(self, iterable, progress=None, **kwargs):
         if progress is True:
@@ -57,22 +76,39 @@ class MassSpecFileReader(ABC):
             return _ProgressIterWrapper(iterable, progress)
         return iterable
 
+    @contextmanager
+    def _progress_counter(self, progress=None, **kwargs):
+        """
+        Like `_progress`, for work that completes in batches: yields an
+        ``advance(n)`` callable instead of wrapping an iterable.
+        """
+        if progress is True:
+            with tqdm(**kwargs) as bar:
+                yield bar.update
+        elif progress:
+            yield progress.update
+        else:
+            yield lambda n: None
+
     @staticmethod
     def extract_run_name(filepath: Union[str, Path]):
 
         filepath = Path(filepath)
-        filename = filepath.name
+        stem = filepath.name
+        low = stem.lower()
 
-        # remove compression ext
-        for comp_ext in COMPRESSION_EXTENSIONS:
-            if filename.lower().endswith(comp_ext):
-                filename = filename[: -len(comp_ext)]
+        # peel extensions from the right: compression ones, then the ms one
+        while True:
+            dot = low.rfind(".")
+            if dot < 0:
                 break
-
-        # remove ms file ext
-        for ms_ext in MS_EXTENSIONS:
-            if filename.lower().endswith(ms_ext):
-                return filename[: -len(ms_ext)]
+            ext = low[dot:]
+            if ext in _COMPRESSION_EXT_SET:
+                stem, low = stem[:dot], low[:dot]
+                continue
+            if ext in _MS_EXT_SET:
+                return stem[:dot]
+            break
 
         return filepath.stem
 
@@ -103,20 +139,141 @@ class MassSpecFileReader(ABC):
         """
         raise NotImplementedError()
 
-    @abstractmethod
+    def _read_frame(self, frame_num: int) -> PeakArray:
+        """
+        Reads one frame from the file, bypassing the frame cache. Readers
+        override this; subclasses that override `get_frame` instead (the
+        extension point before the cache) keep working through it.
+        """
+        if type(self).get_frame is not MassSpecFileReader.get_frame:
+            return self.get_frame(frame_num)
+        raise NotImplementedError()
+
+    def _read_frames(self, frame_nums: List[int]) -> List[PeakArray]:
+        """Reads several distinct frames; readers override this to batch."""
+        return [self._read_frame(fn) for fn in frame_nums]
+
+    def _read_frames_into(self, frame_nums: List[int], builder: PeakArrayBuilder):
+        """
+        Reads several distinct frames into ``builder``, one ``commit`` per
+        frame in the order of ``frame_nums``; readers override this to decode
+        straight into the builder's buffer.
+        """
+        for peaks in self._read_frames(frame_nums):
+            builder.append(peaks)
+
+    def _frames_capacity(self, frame_nums: List[int]) -> Optional[int]:
+        """Upper bound on the peaks of ``frame_nums`` if cheaply known, else None."""
+        return None
+
+    def _cache_put(self, frame_num: int, peaks: PeakArray):
+        if self.frame_cache_size <= 0:
+            return
+        # cached arrays are handed out to every caller, so freeze them;
+        # empty frames may share the module-level empty array, leave those be
+        if len(peaks):
+            peaks.mz.flags.writeable = False
+            peaks.ab.flags.writeable = False
+        self._frame_cache[frame_num] = peaks
+        if len(self._frame_cache) > self.frame_cache_size:
+            self._frame_cache.popitem(last=False)
+
+    def _cache_get(self, frame_num: int):
+        peaks = self._frame_cache.get(frame_num)
+        if peaks is not None:
+            self._frame_cache.move_to_end(frame_num)
+            self._cache_hits += 1
+        return peaks
+
     def get_frame(self, frame_num: int) -> PeakArray:
         """
         Returns:
-            PeakArray: NamedTuple(mz=np.ndarray[float32], ab=np.ndarray[float32])
+            PeakArray: NamedTuple(mz=np.ndarray[float32], ab=np.ndarray[float32]),
+                read-only if ``frame_cache_size`` is set, as it may then be
+                shared through the frame cache
         """
-        raise NotImplementedError()
+        frame_num = int(frame_num)
+        peaks = self._cache_get(frame_num)
+        if peaks is None:
+            self._cache_misses += 1
+            peaks = self._read_frame(frame_num)
+            self._cache_put(frame_num, peaks)
+        return peaks
 
-    def get_frames(self, frame_nums: Sequence[int]) -> List[PeakArray]:
+    def get_frames(
+        self, frame_nums: Sequence[int], as_list: bool = True
+    ) -> Union[List[PeakArray], Tuple[PeakArray, np.ndarray]]:
         """
+        Cached frames are returned as is; the others are read in one batch.
+
         Returns:
-            List[PeakArray]
+            List[PeakArray]: in the order of ``frame_nums``, or with
+                ``as_list=False`` ``(PeakArray, offsets)``: one contiguous
+                buffer where frame i is ``offsets[i]:offsets[i + 1]``
         """
-        return [self.get_frame(fn) for fn in frame_nums]
+        frame_nums = [int(fn) for fn in frame_nums]
+        cached = [self._cache_get(fn) for fn in frame_nums]
+        # distinct misses, in first-seen order
+        missing = list(
+            dict.fromkeys(fn for fn, peaks in zip(frame_nums, cached) if peaks is None)
+        )
+        self._cache_misses += len(missing)
+
+        if as_list:
+            read = dict(zip(missing, self._read_frames(missing))) if missing else {}
+            for fn, peaks in read.items():
+                self._cache_put(fn, peaks)
+            return [
+                read[fn] if peaks is None else peaks
+                for fn, peaks in zip(frame_nums, cached)
+            ]
+
+        # misses are decoded straight into one slab sized from the frame lengths
+        capacity = self._frames_capacity(missing) if missing else 0
+        builder = PeakArrayBuilder() if capacity is None else PeakArrayBuilder(capacity)
+        if missing:
+            self._read_frames_into(missing, builder)
+        slab, peak_start, peak_stop = builder.build()
+        offsets = np.zeros(len(missing) + 1, dtype=np.int64)
+        offsets[1:] = peak_stop
+        read = self._cache_slab(missing, slab, peak_start, peak_stop)
+        if len(missing) == len(frame_nums):
+            # every frame read once, in request order: the slab is the result
+            return slab, offsets
+        return concat_peak_arrays(
+            [
+                read[fn] if peaks is None else peaks
+                for fn, peaks in zip(frame_nums, cached)
+            ]
+        )
+
+    def _cache_slab(self, frame_nums, slab: PeakArray, peak_start, peak_stop):
+        """
+        Splits ``slab`` into per-frame views, returned by frame. The cache gets
+        copies, so a cached frame never keeps the whole slab alive or makes
+        the caller's slab read-only.
+        """
+        views = {}
+        for fn, st, ed in zip(frame_nums, peak_start.tolist(), peak_stop.tolist()):
+            views[fn] = PeakArray(slab.mz[st:ed], slab.ab[st:ed])
+            if self.frame_cache_size > 0:
+                self._cache_put(
+                    fn, PeakArray(slab.mz[st:ed].copy(), slab.ab[st:ed].copy())
+                )
+        return views
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(
+            self._cache_hits,
+            self._cache_misses,
+            self.frame_cache_size,
+            len(self._frame_cache),
+        )
+
+    def clear_cache(self):
+        self._frame_cache.clear()
+        self._cache_hits = 0
+        self._cache_misses = 0
 
     @abstractmethod
     def load(self, progress=None) -> MassSpecData:
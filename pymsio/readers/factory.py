@@ -7,7 +7,12 @@ from .mzml import MzmlFileReader
 
 
 class ReaderFactory:
-    supported_file_extensions = [".raw", ".mzml", ".mzml.gz"]
+    _readers = {
+        ".raw": ThermoRawReader,
+        ".mzml": MzmlFileReader,
+        ".mzml.gz": MzmlFileReader,
+    }
+    supported_file_extensions = frozenset(_readers)
 
     @classmethod
     def _normalize_ext(cls, path: Path) -> str:
@@ -26,17 +31,11 @@ class ReaderFactory:
 
         ext = cls._normalize_ext(filepath)
 
-        if ext not in cls.supported_file_extensions:
+        reader_cls = cls._readers.get(ext)
+        if reader_cls is None:
             raise ValueError(
                 f"Unsupported file type: {ext}. "
-                f"Supported: {', '.join(cls.supported_file_extensions)}"
+                f"Supported: {', '.join(sorted(cls.supported_file_extensions))}"
             )
 
-        if ext == ".raw":
-            reader = ThermoRawReader(filepath)
-        elif ext in (".mzml", ".mzml.gz"):
-            reader = MzmlFileReader(filepath)
-        else:
-            raise ValueError(f"Unsupported file type: {ext}")
-
-        return reader
+        return reader_cls(filepath)
@@ -1,3 +1,8 @@
+import os
+import sys
+import sysconfig
+import threading
+from collections import OrderedDict
 from typing import Union, List, Sequence, NamedTuple, Optional
 from pathlib import Path
 
@@ -5,7 +10,21 @@ import h5py
 import polars as pl
 import numpy as np
 
-from pymsio.readers.utils import get_frame_num_to_index_arr, compute_z_score_cdf_numba
+from pymsio.readers.utils import (
+    get_frame_num_to_index_arr,
+    compute_z_score_cdf_numba,
+    concat_ranges,
+)
+
+try:
+    import hdf5plugin
+except ImportError:
+    hdf5plugin = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
 
 
 META_SCHEMA = {
@@ -20,6 +39,29 @@ META_SCHEMA = {
 
 _EMPTY_F32 = np.array([], dtype=np.float32)
 
+# ``format`` attribute of a run group written by `MassSpecData.write_hdf`;
+# groups without it were written by older versions via pandas ``to_hdf``
+HDF_FORMAT = "pymsio-columns-1"
+
+ENV_POOL = "PYMSIO_POOL"
+
+
+def _peak_dataset_kwargs(num_peaks: int) -> dict:
+    """
+    Chunked, byte-shuffled compression for the float32 peak datasets:
+    Blosc/LZ4 if hdf5plugin is installed, otherwise h5py's built-in LZF.
+    """
+    if num_peaks == 0:
+        return {}
+    kwargs = {"chunks": (min(num_peaks, 1 << 20),)}
+    if hdf5plugin is not None:
+        kwargs.update(
+            hdf5plugin.Blosc(cname="lz4", clevel=3, shuffle=hdf5plugin.Blosc.SHUFFLE)
+        )
+    else:
+        kwargs.update(compression="lzf", shuffle=True)
+    return kwargs
+
 
 class PeakArray(NamedTuple):
     """Pair of contiguous 1-D float32 arrays (mz, ab)."""
@@ -31,10 +73,255 @@ class PeakArray(NamedTuple):
     def empty() -> "PeakArray":
         return PeakArray(_EMPTY_F32, _EMPTY_F32)
 
+    @staticmethod
+    def allocate(n: int) -> "PeakArray":
+        """Uninitialised arrays for ``n`` peaks, carved from one float32 buffer."""
+        buf = np.empty(2 * n, dtype=np.float32)
+        return PeakArray(buf[:n], buf[n:])
+
     def __len__(self) -> int:
         return self.mz.shape[0]
 
 
+class PeakBufferPool:
+    """
+    Process-wide free lists of power-of-two sized buffers, so pipelines that
+    load many files in a row reuse the large peak buffers instead of
+    allocating (and page-faulting) fresh ones for every file.
+
+    At most ``max_bytes`` of released buffers are kept; the least recently
+    released sizes are dropped first.
+    """
+
+    def __init__(self, max_bytes: int = 4 << 30):
+        self.max_bytes = max_bytes
+        self._free: "OrderedDict[tuple, List[np.ndarray]]" = OrderedDict()
+        self._num_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def num_bytes(self) -> int:
+        return self._num_bytes
+
+    def acquire(self, n: int, dtype=np.float32) -> np.ndarray:
+        """Uninitialised array of ``n`` elements, a view of a pooled buffer."""
+        size = 1 << max(int(n) - 1, 0).bit_length()
+        key = (size, np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                buf = free.pop()
+                self._num_bytes -= buf.nbytes
+                if not free:
+                    del self._free[key]
+            else:
+                buf = None
+        if buf is None:
+            buf = np.empty(size, dtype=dtype)
+        return buf[:n]
+
+    def release(self, arr: np.ndarray):
+        """Returns the buffer behind ``arr``; no view of it may be used afterwards."""
+        buf = arr if arr.base is None else arr.base
+        if not isinstance(buf, np.ndarray) or buf.size & (buf.size - 1):
+            return  # not one of ours
+        key = (buf.size, buf.dtype.str)
+        with self._lock:
+            self._free.setdefault(key, []).append(buf)
+            self._free.move_to_end(key)
+            self._num_bytes += buf.nbytes
+            while self._num_bytes > self.max_bytes:
+                free = next(iter(self._free.values()))
+                self._num_bytes -= free.pop(0).nbytes
+                if not free:
+                    self._free.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._free.clear()
+            self._num_bytes = 0
+
+
+# close() decides whether a buffer can be recycled from sys.getrefcount, which
+# is only exact and immediate on CPython with the GIL; elsewhere never pool
+_EXACT_REFCOUNTS = (
+    sys.implementation.name == "cpython"
+    and not sysconfig.get_config_var("Py_GIL_DISABLED")
+)
+
+# opt-in: pooled buffers are handed back with MassSpecData.close()
+_PEAK_BUFFER_POOL: Optional[PeakBufferPool] = None
+_PEAK_BUFFER_POOL_LOCK = threading.Lock()
+
+
+def get_peak_buffer_pool() -> Optional[PeakBufferPool]:
+    """
+    The process-wide pool, or ``None`` unless ``PYMSIO_POOL=1`` is set; the
+    variable is read on each call, so it may be set after import. Always
+    ``None`` on interpreters without exact reference counts (PyPy,
+    free-threaded CPython).
+    """
+    global _PEAK_BUFFER_POOL
+    if not _EXACT_REFCOUNTS or os.getenv(ENV_POOL) != "1":
+        return None
+    if _PEAK_BUFFER_POOL is None:
+        with _PEAK_BUFFER_POOL_LOCK:
+            if _PEAK_BUFFER_POOL is None:
+                _PEAK_BUFFER_POOL = PeakBufferPool()
+    return _PEAK_BUFFER_POOL
+
+
+def _is_unshared(arr: np.ndarray) -> bool:
+    """
+    True if nothing but the caller's one local references ``arr`` or its
+    buffer: no frame views, caches or exports (Arrow, memoryview) remain.
+    Counts are compared against a probe held the same way, so they do not
+    depend on how the interpreter counts call references.
+    """
+    probe = np.empty(2, dtype=arr.dtype)[:1]
+    # ``arr`` is held here and by the caller, ``probe`` only here
+    view_ok = sys.getrefcount(arr) <= sys.getrefcount(probe) + 1
+    return view_ok and sys.getrefcount(arr.base) <= sys.getrefcount(probe.base)
+
+
+class PeakArrayBuilder:
+    """
+    Accumulates the peaks of consecutive frames into one pair of float32
+    buffers, so readers can write each frame straight into its final place
+    instead of keeping a list of per-frame arrays around.
+
+    Buffers grow geometrically with ``ndarray.resize``; for large buffers this
+    is a ``realloc``/``mremap`` and usually does not copy. Views returned by
+    ``reserve`` are only valid until the next ``reserve`` call.
+
+    With the `PeakBufferPool` enabled the buffers come from the pool instead
+    and ``build`` returns views of them without trimming.
+    """
+
+    def __init__(self, capacity: int = 1 << 20):
+        capacity = max(int(capacity), 1)
+        self._pool = get_peak_buffer_pool()
+        self._mz = self._alloc(capacity)
+        self._ab = self._alloc(capacity)
+        self._size = 0
+        self._counts: List[int] = []
+
+    @property
+    def pooled(self) -> bool:
+        return self._pool is not None
+
+    def _alloc(self, capacity: int) -> np.ndarray:
+        if self._pool is None:
+            return np.empty(capacity, dtype=np.float32)
+        return self._pool.acquire(capacity, np.float32)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def num_frames(self) -> int:
+        return len(self._counts)
+
+    def _grow(self, min_capacity: int):
+        capacity = self._mz.shape[0]
+        while capacity < min_capacity:
+            capacity *= 2
+        if self._pool is None:
+            self._mz.resize(capacity, refcheck=False)
+            self._ab.resize(capacity, refcheck=False)
+            return
+        for name in ("_mz", "_ab"):
+            old = getattr(self, name)
+            new = self._alloc(capacity)
+            new[: self._size] = old[: self._size]
+            self._pool.release(old)
+            setattr(self, name, new)
+
+    def reserve(self, n: int) -> PeakArray:
+        """Returns writable (mz, ab) views for up to ``n`` peaks of the next frame."""
+        stop = self._size + n
+        if stop > self._mz.shape[0]:
+            self._grow(stop)
+        return PeakArray(self._mz[self._size : stop], self._ab[self._size : stop])
+
+    def commit(self, n: int):
+        """Closes the current frame with the first ``n`` reserved peaks."""
+        self._size += n
+        self._counts.append(n)
+
+    def append(self, peaks: PeakArray):
+        n = len(peaks)
+        out = self.reserve(n)
+        out.mz[:] = peaks.mz
+        out.ab[:] = peaks.ab
+        self.commit(n)
+
+    def rewind(self, num_frames: int):
+        """Drops the frames committed after the first ``num_frames``."""
+        del self._counts[num_frames:]
+        self._size = sum(self._counts)
+
+    def extend(self, peaks: PeakArray, peak_counts: np.ndarray):
+        """Appends several frames at once; ``peak_counts`` must sum to ``len(peaks)``."""
+        n = len(peaks)
+        out = self.reserve(n)
+        out.mz[:] = peaks.mz
+        out.ab[:] = peaks.ab
+        self._size += n
+        self._counts.extend(np.asarray(peak_counts).tolist())
+
+    def build(self):
+        """
+        Returns:
+            (PeakArray, peak_start, peak_stop): trimmed buffers and int64 offsets
+        """
+        if self._pool is None:
+            self._mz.resize(self._size, refcheck=False)
+            self._ab.resize(self._size, refcheck=False)
+        else:
+            self._mz = self._mz[: self._size]
+            self._ab = self._ab[: self._size]
+        peak_stop = np.cumsum(np.asarray(self._counts, dtype=np.int64), dtype=np.int64)
+        peak_start = np.zeros_like(peak_stop)
+        peak_start[1:] = peak_stop[:-1]
+        return PeakArray(self._mz, self._ab), peak_start, peak_stop
+
+
+def concat_peak_arrays(list_of_peaks: Sequence[PeakArray]):
+    """
+    Copies per-frame peaks into one contiguous pair of float32 buffers.
+
+    Returns:
+        (PeakArray, offsets): frame i is ``offsets[i]:offsets[i + 1]``;
+            ``offsets`` is int64 with ``len(list_of_peaks) + 1`` entries
+    """
+    num_frames = len(list_of_peaks)
+    offsets = np.zeros(num_frames + 1, dtype=np.int64)
+    np.cumsum(
+        np.fromiter((len(p) for p in list_of_peaks), dtype=np.int64, count=num_frames),
+        out=offsets[1:],
+    )
+
+    # fill one preallocated buffer instead of np.concatenate, which would
+    # hold the per-frame arrays and the concatenated copy at the same time
+    mz_out, ab_out = PeakArray.allocate(int(offsets[-1]))
+    # plain-int bounds: slicing with numpy scalars costs a conversion per call
+    bounds = offsets.tolist()
+    for p, st, ed in zip(list_of_peaks, bounds[:-1], bounds[1:]):
+        mz_out[st:ed] = p.mz
+        ab_out[st:ed] = p.ab
+
+    return PeakArray(mz_out, ab_out), offsets
+
+
+def _attach_peak_index(
+    meta_df: pl.DataFrame, peak_start: np.ndarray, peak_stop: np.ndarray
+) -> pl.DataFrame:
+    return meta_df.select(pl.col(list(META_SCHEMA))).with_columns(
+        peak_start=peak_start, peak_stop=peak_stop
+    )
+
+
 class MassSpecData:
 
     thread_safe = False
@@ -48,8 +335,43 @@ class MassSpecData:
         self.run_name = run_name
         self.frame_num_to_index = get_frame_num_to_index_arr(meta_df["frame_num"])
         self.meta_df = meta_df
+        # numpy copies of the index columns, converted once for the hot paths
+        self._frame_num_arr = meta_df["frame_num"].to_numpy()
+        self._peak_range_arr = (
+            meta_df.select(pl.col("peak_start", "peak_stop").cast(pl.Int64))
+            .to_numpy()
+            .reshape(-1, 2)
+        )
         self.peaks = peaks
         self.z_score_arr: Optional[np.ndarray] = None
+        # set by from_builder when the peak buffers belong to the buffer pool
+        self._pooled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Hands pooled peak buffers back to the `PeakBufferPool` (``PYMSIO_POOL=1``).
+        A buffer that is still referenced elsewhere (``peaks``, frame views,
+        `to_arrow`/`to_polars` output) is not pooled but left to the garbage
+        collector, so such references stay valid. Without the pool this only
+        drops the references.
+        """
+        mz, ab = self.peaks
+        pooled, self._pooled = self._pooled, False
+        self.peaks = PeakArray.empty()
+        self.z_score_arr = None
+
+        pool = get_peak_buffer_pool()
+        if pooled and pool is not None:
+            if _is_unshared(mz):
+                pool.release(mz)
+            if _is_unshared(ab):
+                pool.release(ab)
 
     @classmethod
     def create(
@@ -60,33 +382,36 @@ class MassSpecData:
     ):
         assert meta_df.shape[0] == len(list_of_peaks)
 
-        meta_df = (
-            meta_df.with_columns(
-                peak_count=np.asarray([len(p) for p in list_of_peaks], dtype=np.uint32)
-            )
-            .with_columns(pl.col("peak_count").cum_sum().alias("peak_stop"))
-            .with_columns(pl.col("peak_stop").shift(1).fill_null(0).alias("peak_start"))
-            .select(pl.col(list(META_SCHEMA)), pl.col("peak_start", "peak_stop"))
-        )
-
-        peaks = PeakArray(
-            np.concatenate([p.mz for p in list_of_peaks]),
-            np.concatenate([p.ab for p in list_of_peaks]),
-        )
+        peaks, offsets = concat_peak_arrays(list_of_peaks)
+        meta_df = _attach_peak_index(meta_df, offsets[:-1], offsets[1:])
 
         return cls(run_name, meta_df, peaks)
 
+    @classmethod
+    def from_builder(
+        cls,
+        run_name: str,
+        meta_df: pl.DataFrame,
+        builder: PeakArrayBuilder,
+    ):
+        assert meta_df.shape[0] == builder.num_frames
+
+        peaks, peak_start, peak_stop = builder.build()
+        meta_df = _attach_peak_index(meta_df, peak_start, peak_stop)
+
+        ms_data = cls(run_name, meta_df, peaks)
+        ms_data._pooled = builder.pooled
+        return ms_data
+
     def compute_z_score(self):
         if self.z_score_arr is None:
-            peak_range_arr = self.meta_df.select(
-                pl.col("peak_start", "peak_stop")
-            ).to_numpy()
-            self.z_score_arr = compute_z_score_cdf_numba(self.peaks.ab, peak_range_arr)
+            self.z_score_arr = compute_z_score_cdf_numba(
+                self.peaks.ab, self._peak_range_arr
+            )
 
     def get_peak_index(self, frame_num: int):
-        idx = self.frame_num_to_index[frame_num]
-        st = self.meta_df.item(idx, "peak_start")
-        ed = self.meta_df.item(idx, "peak_stop")
+        idx = self.frame_num_to_index.lookup(frame_num)
+        st, ed = self._peak_range_arr[idx].tolist()
         return st, ed
 
     def get_frame(self, frame_num: int) -> PeakArray:
@@ -94,11 +419,10 @@ class MassSpecData:
         return PeakArray(self.peaks.mz[st:ed], self.peaks.ab[st:ed])
 
     def get_all_peak_df(self):
-        frame_num_arr = np.empty(self.peaks.mz.shape[0], dtype=np.uint32)
-        for fn, st, ed in self.meta_df.select(
-            pl.col("frame_num", "peak_start", "peak_stop")
-        ).iter_rows():
-            frame_num_arr[st:ed] = fn
+        frame_num_arr = np.repeat(
+            self._frame_num_arr,
+            self._peak_range_arr[:, 1] - self._peak_range_arr[:, 0],
+        )
 
         peak_df = pl.DataFrame(
             {
@@ -111,37 +435,49 @@ class MassSpecData:
 
     def collect_peaks(self, frame_nums: Sequence[int]):
 
-        peak_idx_df = self.meta_df[self.frame_num_to_index[frame_nums]].select(
-            pl.col("frame_num", "peak_start", "peak_stop")
-        )
+        row_idx = np.atleast_1d(self.frame_num_to_index.lookup(frame_nums))
 
-        num_peaks = peak_idx_df.select(
-            (pl.col("peak_stop") - pl.col("peak_start")).alias("num_peaks")
-        )["num_peaks"].sum()
+        peak_range_arr = self._peak_range_arr[row_idx]
+        peak_start = peak_range_arr[:, 0]
+        num_peaks = peak_range_arr[:, 1] - peak_start
 
-        frame_num_arr = np.empty(num_peaks, dtype=np.uint32)
-        mz_out = np.empty(num_peaks, dtype=np.float32)
-        ab_out = np.empty(num_peaks, dtype=np.float32)
+        # one flat index over all requested ranges, so each array is a single take
+        gather_idx = concat_ranges(peak_start, num_peaks)
+
+        frame_num_arr = np.repeat(self._frame_num_arr[row_idx], num_peaks)
+        mz_out = np.take(self.peaks.mz, gather_idx)
+        ab_out = np.take(self.peaks.ab, gather_idx)
         z_out = (
-            None if self.z_score_arr is None else np.empty(num_peaks, dtype=np.float32)
+            None if self.z_score_arr is None else np.take(self.z_score_arr, gather_idx)
         )
 
-        st = 0
-        for frame_index, (frame_num, peak_st, peak_ed) in enumerate(
-            peak_idx_df.iter_rows()
-        ):
-            n = peak_ed - peak_st
-            if n > 0:
-                ed = st + n
-                frame_num_arr[st:ed] = frame_num
-                mz_out[st:ed] = self.peaks.mz[peak_st:peak_ed]
-                ab_out[st:ed] = self.peaks.ab[peak_st:peak_ed]
-                if self.z_score_arr is not None:
-                    z_out[st:ed] = self.z_score_arr[peak_st:peak_ed]
-                st = ed
-
         return frame_num_arr, mz_out, ab_out, z_out
 
+    def to_arrow(self):
+        """
+        Peaks as a ``pyarrow.StructArray`` of float32 ``mz``/``ab`` that wraps
+        the peak buffers without copying (the Arrow buffers keep them alive).
+        """
+        if pa is None:
+            raise ImportError("MassSpecData.to_arrow requires pyarrow")
+        fields = [
+            pa.Array.from_buffers(
+                pa.float32(),
+                len(arr),
+                [None, pa.py_buffer(np.ascontiguousarray(arr, dtype=np.float32))],
+            )
+            for arr in self.peaks
+        ]
+        return pa.StructArray.from_arrays(fields, names=list(PeakArray._fields))
+
+    def to_polars(self) -> pl.DataFrame:
+        """
+        Peaks as an ``mz``/``ab`` DataFrame sharing memory with ``peaks``
+        (through `to_arrow`); see `get_all_peak_df` for the frame_num column.
+        """
+        peaks = self.to_arrow()
+        return pl.from_arrow(pa.RecordBatch.from_struct_array(peaks))
+
     def write_hdf(
         self,
         file_path: Union[str, Path],
@@ -157,9 +493,81 @@ class MassSpecData:
                 else:
                     raise FileExistsError("LC/MS data already exists")
             hf_grp = hf.create_group(group_key)
-            hf_grp.create_dataset("mz", data=self.peaks.mz, dtype=np.float32)
-            hf_grp.create_dataset("ab", data=self.peaks.ab, dtype=np.float32)
+            hf_grp.attrs["format"] = HDF_FORMAT
 
-        self.meta_df.to_pandas().to_hdf(
-            file_path, key=f"{group_key}/meta_df", index=False
+            peak_kwargs = _peak_dataset_kwargs(len(self.peaks))
+            hf_grp.create_dataset(
+                "mz", data=self.peaks.mz, dtype=np.float32, **peak_kwargs
+            )
+            hf_grp.create_dataset(
+                "ab", data=self.peaks.ab, dtype=np.float32, **peak_kwargs
+            )
+
+            # one dataset per column; nulls are stored as NaN
+            meta_grp = hf_grp.create_group("meta_df")
+            for col, dtype in self.meta_df.schema.items():
+                series = self.meta_df[col]
+                if dtype.is_float():
+                    series = series.fill_null(np.nan)
+                meta_grp.create_dataset(col, data=series.to_numpy())
+
+    @classmethod
+    def read_hdf(cls, file_path: Union[str, Path], run_name: str):
+        with h5py.File(file_path, "r") as hf:
+            hf_grp = hf[run_name]
+            peaks = PeakArray(hf_grp["mz"][:], hf_grp["ab"][:])
+            meta_grp = hf_grp["meta_df"]
+            fmt = hf_grp.attrs.get("format")
+            if fmt == HDF_FORMAT:
+                cols = {
+                    col: meta_grp[col][:]
+                    for col in (*META_SCHEMA, "peak_start", "peak_stop")
+                }
+            elif fmt is None and "pandas_type" in meta_grp.attrs:
+                cols = None
+            else:
+                raise ValueError(
+                    f"Unsupported HDF layout for run '{run_name}' (format={fmt!r})"
+                )
+
+        if cols is None:
+            # written by pymsio before the column layout, via pandas to_hdf
+            import pandas as pd
+
+            meta_df = pl.from_pandas(pd.read_hdf(file_path, key=f"{run_name}/meta_df"))
+        else:
+            meta_df = pl.DataFrame(cols, nan_to_null=True)
+        meta_df = meta_df.cast(META_SCHEMA)
+        return cls(run_name, meta_df, peaks)
+
+    def write_mmap(self, path: Union[str, Path]):
+        """
+        Writes ``<path>.mz.f32`` / ``<path>.ab.f32`` (raw float32) and
+        ``<path>.meta.parquet`` for `open_mmap`.
+        """
+        path = str(path)
+        self.peaks.mz.astype(np.float32, copy=False).tofile(path + ".mz.f32")
+        self.peaks.ab.astype(np.float32, copy=False).tofile(path + ".ab.f32")
+        self.meta_df.write_parquet(path + ".meta.parquet")
+
+    @classmethod
+    def open_mmap(cls, path: Union[str, Path], run_name: Optional[str] = None):
+        """
+        Opens files written by `write_mmap` without reading the peaks into RAM;
+        ``peaks.mz``/``peaks.ab`` are read-only memory maps paged in on access.
+        """
+        path = str(path)
+        meta_df = pl.read_parquet(path + ".meta.parquet")
+        peaks = PeakArray(
+            _open_f32_memmap(path + ".mz.f32"), _open_f32_memmap(path + ".ab.f32")
         )
+        if run_name is None:
+            run_name = Path(path).name
+        return cls(run_name, meta_df, peaks)
+
+
+def _open_f32_memmap(file_path: str) -> np.ndarray:
+    # np.memmap cannot map an empty file
+    if Path(file_path).stat().st_size == 0:
+        return _EMPTY_F32
+    return np.memmap(file_path, dtype=np.float32, mode="r")
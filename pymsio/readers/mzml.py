@@ -6,29 +6,76 @@ Focus on the actual bottlenecks: XML parsing, zlib decompression, and peak proce
 from pathlib import Path
 from typing import Optional, Union, List, Tuple, Dict, Any, Sequence
 import io
+import mmap
 import re
 import binascii
 import zlib
 import gzip
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from functools import lru_cache
+import logging
+import threading
 
 try:
     from lxml import etree as ET
+
+    # lifts the 10 MB text-node limit for large <binary> blocks
+    _FRAGMENT_PARSER = ET.XMLParser(huge_tree=True)
 except ImportError:
     import xml.etree.cElementTree as ET
 
+    _FRAGMENT_PARSER = None
+
 try:
     import isal.isal_zlib as fast_zlib
+    from isal import igzip as fast_gzip
 except ImportError:
     fast_zlib = zlib
+    fast_gzip = gzip
+
+try:
+    # background-thread inflate (python-isal >= 1.3)
+    from isal import igzip_threaded
+except ImportError:
+    igzip_threaded = None
+
+try:
+    # SIMD (AVX2/NEON) base64; skips whitespace like binascii.a2b_base64
+    from pybase64 import b64decode as fast_b64decode
+except ImportError:
+    fast_b64decode = binascii.a2b_base64
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 import numpy as np
 import numba as nb
 import polars as pl
 
 from pymsio.readers.base import MassSpecFileReader
-from pymsio.readers.ms_data import MassSpecData, PeakArray, META_SCHEMA
-
+from pymsio.readers.ms_data import (
+    MassSpecData,
+    PeakArray,
+    PeakArrayBuilder,
+    META_SCHEMA,
+)
+from pymsio.readers.utils import pack_peaks
+
+logger = logging.getLogger(__name__)
+
+# raised when the spectrum offsets do not match the file: ValueError from
+# _parse_spectrum_at, or a SyntaxError subclass (lxml XMLSyntaxError /
+# ElementTree ParseError) for a fragment that is not well-formed
+_STALE_INDEX_ERRORS = (ValueError, SyntaxError)
+
+# malformed base64 / compressed payloads; np.frombuffer raises ValueError too
+_DECODE_ERRORS = (ValueError, zlib.error, fast_zlib.error) + (
+    (zstandard.ZstdError,) if zstandard is not None else ()
+)
 
 # MS ontology accession codes as constants for faster lookup
 MS_ACCESSIONS = {
@@ -51,12 +98,67 @@ COMMON_TAGS = {
     "isolationWindow",
 }
 
+# Int codes the spectrum parser branches on instead of comparing strings
+(
+    _CV_OTHER,
+    _CV_SCAN_START_TIME,
+    _CV_MS_LEVEL,
+    _CV_MZ_ARRAY,
+    _CV_INTENSITY_ARRAY,
+    _CV_FLOAT32,
+    _CV_FLOAT64,
+    _CV_ZLIB_COMPRESSION,
+) = range(8)
+
+_ACCESSION_CODES = {
+    accession: {
+        "scan_start_time": _CV_SCAN_START_TIME,
+        "ms_level": _CV_MS_LEVEL,
+        "mz_array": _CV_MZ_ARRAY,
+        "intensity_array": _CV_INTENSITY_ARRAY,
+        "float32": _CV_FLOAT32,
+        "float64": _CV_FLOAT64,
+        "zlib_compression": _CV_ZLIB_COMPRESSION,
+    }[name]
+    for accession, name in MS_ACCESSIONS.items()
+}
+
+(
+    _TAG_OTHER,
+    _TAG_CV_PARAM,
+    _TAG_SCAN_WINDOW,
+    _TAG_ISOLATION_WINDOW,
+    _TAG_BINARY_DATA_ARRAY,
+    _TAG_BINARY,
+) = range(6)
+
+_LOCAL_TAG_CODES = {
+    "cvParam": _TAG_CV_PARAM,
+    "scanWindow": _TAG_SCAN_WINDOW,
+    "isolationWindow": _TAG_ISOLATION_WINDOW,
+    "binaryDataArray": _TAG_BINARY_DATA_ARRAY,
+    "binary": _TAG_BINARY,
+}
+
+# qualified tag (e.g. "{http://psi.hupo.org/ms/mzml}cvParam") -> code
+_TAG_CODES: Dict[Any, int] = {}
+
+
+def _tag_code(tag) -> int:
+    code = _TAG_CODES.get(tag)
+    if code is None:
+        # comments and processing instructions have non-str tags
+        local = tag.rpartition("}")[2] if isinstance(tag, str) else ""
+        code = _TAG_CODES[tag] = _LOCAL_TAG_CODES.get(local, _TAG_OTHER)
+    return code
+
+
 NUMERIC_PATTERN = re.compile(r"^[0-9]+\.?[0-9]*$")
 NUMERIC_WITH_MINUS_PATTERN = re.compile(r"^-?[0-9]+\.?[0-9]*$")
 
 
 # Optimized peak processing using Numba JIT compilation
-@nb.njit(cache=True, fastmath=True)
+@nb.njit(cache=True, fastmath=True, nogil=True)
 def fast_process_peaks(mz_arr, int_arr):
     """Filter peaks with positive intensity. Returns (mz, ab) 1-D float32 arrays."""
 
@@ -79,8 +181,10 @@ def fast_process_peaks(mz_arr, int_arr):
     if valid_count == 0:
         return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
 
-    mz_out = np.empty(valid_count, dtype=np.float32)
-    ab_out = np.empty(valid_count, dtype=np.float32)
+    # one allocation for both outputs (see PeakArray.allocate)
+    buf = np.empty(2 * valid_count, dtype=np.float32)
+    mz_out = buf[:valid_count]
+    ab_out = buf[valid_count:]
     idx = 0
     for i in range(min_len):
         if int_arr[i] > 0:
@@ -91,33 +195,84 @@ def fast_process_peaks(mz_arr, int_arr):
     return mz_out, ab_out
 
 
+_ZSTD_LOCAL = threading.local()
+
+
+def _zstd_decompressor():
+    # decompression contexts are reusable but not thread-safe: one per thread
+    dctx = getattr(_ZSTD_LOCAL, "dctx", None)
+    if dctx is None:
+        dctx = _ZSTD_LOCAL.dctx = zstandard.ZstdDecompressor()
+    return dctx
+
+
 def binary_decode(
-    binary_text: str, precision: int, compression: Optional[str] = None
+    binary_text: str,
+    precision: int,
+    compression: Optional[str] = None,
+    array_length: int = 0,
 ) -> np.ndarray:
-    """Optimized binary decoding with zero-copy and memory efficiency."""
+    """
+    Optimized binary decoding with zero-copy and memory efficiency.
+
+    The result keeps the encoded dtype (a read-only view of the decoded
+    bytes); the float32 cast happens when the peaks are packed into their
+    destination, so no intermediate ``astype`` copy is made.
+    ``array_length`` (the spectrum's ``defaultArrayLength``) sizes the zstd
+    output for frames written without a content size; without it such frames
+    are stream-decompressed with no output bound.
+    A payload that fails to decode is logged and yields an empty array.
+    """
     # Early validation to avoid exceptions in normal path
     dtype = np.float64 if precision == 64 else np.float32
     if not binary_text or not binary_text.strip():
         return np.array([], dtype=dtype)
+    if compression == "zstd" and zstandard is None:
+        raise ImportError(
+            "zstd-compressed binary arrays require the 'zstandard' package"
+        )
 
     try:
-        # Fast base64 decode using binascii (faster than base64.b64decode)
-        binary_data = binascii.a2b_base64(binary_text)
+        # Fast base64 decode (pybase64 if installed, else binascii)
+        binary_data = fast_b64decode(binary_text)
 
         # Fast decompression with Intel ISA-L acceleration
         if compression == "zlib":
             binary_data = fast_zlib.decompress(binary_data)
+        elif compression == "zstd":
+            dctx = _zstd_decompressor()
+            if array_length > 0:
+                binary_data = dctx.decompress(
+                    binary_data, max_output_size=array_length * (precision // 8)
+                )
+            else:
+                binary_data = dctx.decompressobj().decompress(binary_data)
 
         # Zero-copy conversion using memoryview
         mv = memoryview(binary_data)
 
         # Use frombuffer with determined dtype
         return np.frombuffer(mv, dtype=dtype)
-    except Exception:
-        # Safe fallback for any decoding errors
+    except _DECODE_ERRORS as e:
+        logger.warning("failed to decode %s binary array: %s", compression, e)
         return np.array([], dtype=dtype)
 
 
+def decode_binary_arrays(
+    encoded_arrays: Dict[str, Tuple[str, int, Optional[str], int]],
+) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Decodes the ``{"mz" | "intensity": (binary_text, precision, compression,
+    array_length)}`` collected by ``_parse_spectrum_element(decode=False)``;
+    empty arrays become ``None``. Safe to run in worker threads.
+    """
+    decoded = {}
+    for array_type, encoded in encoded_arrays.items():
+        arr = binary_decode(*encoded)
+        decoded[array_type] = arr if arr.size > 0 else None
+    return decoded.get("mz"), decoded.get("intensity")
+
+
 class MzmlFileReader(MassSpecFileReader):
     """
     Optimized mzML file reader with JIT acceleration.
@@ -145,38 +300,34 @@ class MzmlFileReader(MassSpecFileReader):
         self.buffer_size = buffer_size_mb * 1024 * 1024
         self._num_spectra: Optional[int] = None
         self._num_spectra_resolved = False
+        self._spectrum_offsets: Optional[np.ndarray] = None
+        self._spectrum_offsets_end = 0
+        self._spectrum_offsets_resolved = False
 
     # ------------------------------------------------------------------
     # Fast spectrum-count extraction
     # ------------------------------------------------------------------
 
-    _RE_OFFSET = re.compile(rb"<offset\b")
+    _RE_OFFSET_VALUE = re.compile(rb"<offset\b[^>]*>\s*([0-9]+)\s*</offset\s*>")
+    _RE_INDEX_LIST_OFFSET = re.compile(
+        rb"<indexListOffset>\s*([0-9]+)\s*</indexListOffset>"
+    )
     _RE_INDEX_SPECTRUM = re.compile(
         rb'<index\s+name\s*=\s*["\']spectrum["\']', re.IGNORECASE
     )
     _RE_INDEX_END = re.compile(rb"</index\s*>")
+    _RE_SPECTRUM_START = re.compile(rb"<spectrum\b")
+    _RE_DEFAULT_ARRAY_LENGTH = re.compile(
+        rb'\sdefaultArrayLength\s*=\s*["\']([0-9]+)["\']'
+    )
     _RE_SPECTRUM_LIST_COUNT = re.compile(
         rb'<spectrumList\s[^>]*count\s*=\s*["\']([0-9]+)["\']'
     )
 
     def _count_from_index_tail(self) -> Optional[int]:
-        """Read the trailing index of an indexed mzML and count <offset> entries."""
-        if self._is_gzipped:
-            return None
-        try:
-            size = self.file_path.stat().st_size
-            tail_size = min(size, 1 << 20)  # last 1 MB
-            with open(self.file_path, "rb") as f:
-                f.seek(size - tail_size)
-                tail = f.read()
-            m = self._RE_INDEX_SPECTRUM.search(tail)
-            if m is None:
-                return None
-            end = self._RE_INDEX_END.search(tail, m.end())
-            block = tail[m.end() : end.start()] if end else tail[m.end() :]
-            return len(self._RE_OFFSET.findall(block))
-        except Exception:
-            return None
+        """Count the spectrum <offset> entries of an indexed mzML."""
+        offsets = self._get_spectrum_offsets()
+        return None if offsets is None else len(offsets)
 
     def _count_from_spectrum_list(self) -> Optional[int]:
         """Read enough of the file header to find <spectrumList count="...">."""
@@ -201,16 +352,166 @@ class MzmlFileReader(MassSpecFileReader):
             self._num_spectra_resolved = True
         return self._num_spectra
 
+    # ------------------------------------------------------------------
+    # Random access via spectrum byte offsets
+    # ------------------------------------------------------------------
+
+    def _read_index_offsets(self) -> Optional[np.ndarray]:
+        """
+        Byte offsets of the ``<spectrum>`` elements from the trailing
+        ``<indexList>`` of an indexedmzML, or ``None`` if there is none.
+        """
+        if self._is_gzipped:
+            return None
+        try:
+            size = self.file_path.stat().st_size
+            with open(self.file_path, "rb") as f:
+                f.seek(max(size - 4096, 0))
+                m = self._RE_INDEX_LIST_OFFSET.search(f.read())
+                if m is None:
+                    return None
+                index_list_offset = int(m.group(1))
+                f.seek(index_list_offset)
+                index_list = f.read()
+            m = self._RE_INDEX_SPECTRUM.search(index_list)
+            if m is None:
+                return None
+            end = self._RE_INDEX_END.search(index_list, m.end())
+            block = index_list[m.end() : end.start() if end else len(index_list)]
+            offsets = np.array(
+                [int(v) for v in self._RE_OFFSET_VALUE.findall(block)], dtype=np.int64
+            )
+        except Exception:
+            return None
+        self._spectrum_offsets_end = index_list_offset
+        return offsets
+
+    def _scan_spectrum_offsets(self) -> Optional[np.ndarray]:
+        """Finds the ``<spectrum`` start tags of a non-indexed, uncompressed file."""
+        if self._is_gzipped:
+            return None
+        with open(self.file_path, "rb") as f:
+            if self.file_path.stat().st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offsets = np.fromiter(
+                    (m.start() for m in self._RE_SPECTRUM_START.finditer(mm)),
+                    dtype=np.int64,
+                )
+                self._spectrum_offsets_end = len(mm)
+        return offsets
+
+    def _get_spectrum_offsets(self) -> Optional[np.ndarray]:
+        """
+        Spectrum byte offsets for random access: from the indexedmzML index,
+        or (with ``build_index=True``) from one scan over a non-indexed file.
+        """
+        if not self._spectrum_offsets_resolved:
+            offsets = self._read_index_offsets()
+            if offsets is None and self.build_index:
+                offsets = self._scan_spectrum_offsets()
+            self._spectrum_offsets = offsets
+            self._spectrum_offsets_resolved = True
+        return self._spectrum_offsets
+
+    def _total_array_length(
+        self, spec_indices: Optional[Sequence[int]] = None
+    ) -> Optional[int]:
+        """
+        Sum of the ``defaultArrayLength`` attributes (of all spectra, or of
+        ``spec_indices``), read from just the start tag of each spectrum via
+        the offsets; ``None`` without offsets.
+        """
+        offsets = self._get_spectrum_offsets()
+        if offsets is None or len(offsets) == 0:
+            return None
+        if spec_indices is None:
+            starts = offsets.tolist()
+        else:
+            starts = [int(offsets[i]) for i in spec_indices if 0 <= i < len(offsets)]
+        pattern = self._RE_DEFAULT_ARRAY_LENGTH
+        total = 0
+        try:
+            with self._mmap_file() as mm:
+                for start in starts:
+                    tag_end = mm.find(b">", start)
+                    m = pattern.search(mm, start, tag_end)
+                    if m is not None:
+                        total += int(m.group(1))
+        except (OSError, ValueError):
+            return None
+        return total
+
+    @contextmanager
+    def _mmap_file(self):
+        with open(self.file_path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            yield mm
+
+    def _parse_spectrum_at(
+        self, mm: mmap.mmap, spec_idx: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Parses only the ``spec_idx``-th ``<spectrum>`` of the memory-mapped
+        file; just its bytes are copied out of the page cache.
+        Raises ValueError if the offsets do not point at a spectrum.
+        """
+        offsets = self._spectrum_offsets
+        if not 0 <= spec_idx < len(offsets):
+            return None
+
+        start = int(offsets[spec_idx])
+        end = self._spectrum_offsets_end
+        if spec_idx + 1 < len(offsets) and offsets[spec_idx + 1] > start:
+            end = int(offsets[spec_idx + 1])
+
+        stop = mm.find(b"</spectrum>", start, end)
+        if stop < 0 or not self._RE_SPECTRUM_START.match(mm, start):
+            raise ValueError(f"no <spectrum> at byte offset {start}")
+
+        elem = ET.fromstring(mm[start : stop + len(b"</spectrum>")], _FRAGMENT_PARSER)
+        return self._parse_spectrum_element(elem)
+
+    def _read_frame_at(self, mm: mmap.mmap, spec_idx: int) -> PeakArray:
+        spectrum_data = self._parse_spectrum_at(mm, spec_idx)
+        if spectrum_data is None:
+            return PeakArray.empty()
+        return PeakArray(
+            *fast_process_peaks(
+                spectrum_data["mz_array"], spectrum_data["intensity_array"]
+            )
+        )
+
     def _open_file_handle(self):
         """Open file handle with configurable buffering for both regular and gzipped files."""
         if self._is_gzipped:
+            if igzip_threaded is not None and self.num_workers > 1:
+                # inflate on a background thread, overlapping XML parsing
+                return igzip_threaded.open(self.file_path, "rb", threads=1)
             # Wrap with a configurable large buffer (default 8MB)
             return io.BufferedReader(
-                gzip.GzipFile(self.file_path, "rb"), buffer_size=self.buffer_size
+                fast_gzip.GzipFile(self.file_path, "rb"), buffer_size=self.buffer_size
             )
         else:
             return open(self.file_path, "rb", buffering=self.buffer_size)
 
+    @staticmethod
+    def _iterparse_spectra(f):
+        """
+        Returns ``(context, use_filter)``. With lxml, only ``<spectrum>`` end
+        events are produced and ``huge_tree`` lifts the 10 MB text-node limit
+        that large profile-mode ``<binary>`` blocks can exceed.
+        """
+        try:
+            return (
+                ET.iterparse(f, events=("end",), tag="{*}spectrum", huge_tree=True),
+                True,
+            )
+        except (TypeError, ValueError):
+            # Fallback for non-lxml parsers
+            return ET.iterparse(f, events=("end",)), False
+
     @lru_cache(maxsize=128)
     def _get_local_tag(self, tag: str) -> str:
         """Extract local tag name efficiently with caching and optimized string ops."""
@@ -220,8 +521,16 @@ class MzmlFileReader(MassSpecFileReader):
         # Optimized namespace extraction - only split once
         return tag.split("}", 1)[1]
 
-    def _parse_spectrum_element(self, spectrum_elem) -> Optional[Dict[str, Any]]:
-        """Parse a single spectrum element from XML with optimized traversal."""
+    def _parse_spectrum_element(
+        self, spectrum_elem, decode: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Parse a single spectrum element from XML with optimized traversal.
+
+        With ``decode=False`` the binary arrays are left encoded in
+        ``"encoded_arrays"`` (see `decode_binary_arrays`) so the caller can
+        decode them off the parsing thread.
+        """
         # Early validation to avoid exceptions
         if spectrum_elem is None:
             return None
@@ -231,6 +540,8 @@ class MzmlFileReader(MassSpecFileReader):
 
         # Safe index parsing with fast numeric check
         index = int(index_str) if index_str.isdigit() else 0
+        length_str = spectrum_elem.get("defaultArrayLength", "0")
+        array_length = int(length_str) if length_str.isdigit() else 0
 
         # Initialize variables
         scan_time = 0.0
@@ -241,23 +552,20 @@ class MzmlFileReader(MassSpecFileReader):
         # Single pass through elements with targeted extraction
         scan_time_found = False
         ms_level_found = False
+        binary_arrays = []
 
         for elem in spectrum_elem.iter():
-            tag = self._get_local_tag(elem.tag)
+            tag_code = _tag_code(elem.tag)
 
             # Skip elements that are not relevant
-            if tag not in COMMON_TAGS:
+            if tag_code == _TAG_OTHER:
                 continue
 
-            if tag == "cvParam":
-                accession = elem.get("accession")
-                if not accession:
-                    continue
-
-                # Use dictionary lookup instead of multiple string comparisons
-                accession_type = MS_ACCESSIONS.get(accession)
+            if tag_code == _TAG_CV_PARAM:
+                # int code lookup instead of string comparisons
+                cv_code = _ACCESSION_CODES.get(elem.get("accession"), _CV_OTHER)
 
-                if accession_type == "scan_start_time" and not scan_time_found:
+                if cv_code == _CV_SCAN_START_TIME and not scan_time_found:
                     value = elem.get("value")
                     if value and NUMERIC_PATTERN.match(value):
                         scan_time = float(value)
@@ -266,16 +574,16 @@ class MzmlFileReader(MassSpecFileReader):
                             scan_time *= 60  # Convert to seconds
                         scan_time_found = True
 
-                elif accession_type == "ms_level" and not ms_level_found:
+                elif cv_code == _CV_MS_LEVEL and not ms_level_found:
                     value = elem.get("value")
                     if value and value.isdigit():
                         ms_level = int(value)
                         ms_level_found = True
 
-            elif tag == "scanWindow":
+            elif tag_code == _TAG_SCAN_WINDOW:
                 # Extract scan window in a single pass
                 for cvparam in elem.iter():
-                    if self._get_local_tag(cvparam.tag) == "cvParam":
+                    if _tag_code(cvparam.tag) == _TAG_CV_PARAM:
                         name = cvparam.get("name")
                         value = cvparam.get("value")
                         if (
@@ -285,11 +593,11 @@ class MzmlFileReader(MassSpecFileReader):
                         ):
                             scan_window[name] = float(value)
 
-            elif tag == "isolationWindow" and ms_level > 1:
+            elif tag_code == _TAG_ISOLATION_WINDOW and ms_level > 1:
                 # Extract isolation window for MS2+ in a single pass
                 isolation_info = {}
                 for cvparam in elem.iter():
-                    if self._get_local_tag(cvparam.tag) == "cvParam":
+                    if _tag_code(cvparam.tag) == _TAG_CV_PARAM:
                         name = cvparam.get("name")
                         value = cvparam.get("value")
                         if value and NUMERIC_WITH_MINUS_PATTERN.match(value):
@@ -305,23 +613,17 @@ class MzmlFileReader(MassSpecFileReader):
                         "isolation_max_mz": target_mz + upper_offset,
                     }
 
-        # Extract binary data arrays with optimized loop
-        binary_arrays = []
-        arrays_needed = 2
-
-        # Collect binary arrays in first pass with early exit
-        for elem in spectrum_elem.iter():
-            if self._get_local_tag(elem.tag) == "binaryDataArray":
+            elif tag_code == _TAG_BINARY_DATA_ARRAY and len(binary_arrays) < 2:
+                # collected here instead of in a second pass over the spectrum
                 binary_arrays.append(elem)
-                # Early exit when we have enough arrays
-                if len(binary_arrays) >= arrays_needed:
-                    break
 
+        # keep the metadata of spectra without both arrays; they get no peaks
         if len(binary_arrays) < 2:
-            return None, None
+            binary_arrays = []
 
         mz_array = None
         intensity_array = None
+        encoded_arrays = {}
         arrays_found = 0
 
         for array_elem in binary_arrays:
@@ -332,25 +634,28 @@ class MzmlFileReader(MassSpecFileReader):
 
             # Single pass through array element children
             for elem in array_elem.iter():
-                tag = self._get_local_tag(elem.tag)
-
-                if tag == "cvParam":
-                    accession = elem.get("accession")
-                    if accession:
-                        accession_type = MS_ACCESSIONS.get(accession)
-
-                        if accession_type == "mz_array":
-                            array_type = "mz"
-                        elif accession_type == "intensity_array":
-                            array_type = "intensity"
-                        elif accession_type == "float32":
-                            precision = 32
-                        elif accession_type == "float64":
-                            precision = 64
-                        elif accession_type == "zlib_compression":
-                            compression = "zlib"
-
-                elif tag == "binary" and binary_elem is None:
+                tag_code = _tag_code(elem.tag)
+
+                if tag_code == _TAG_CV_PARAM:
+                    cv_code = _ACCESSION_CODES.get(elem.get("accession"), _CV_OTHER)
+
+                    if cv_code == _CV_MZ_ARRAY:
+                        array_type = "mz"
+                    elif cv_code == _CV_INTENSITY_ARRAY:
+                        array_type = "intensity"
+                    elif cv_code == _CV_FLOAT32:
+                        precision = 32
+                    elif cv_code == _CV_FLOAT64:
+                        precision = 64
+                    elif cv_code == _CV_ZLIB_COMPRESSION:
+                        compression = "zlib"
+                    elif (
+                        cv_code == _CV_OTHER and "zstd" in elem.get("name", "").lower()
+                    ):
+                        # matched by name: the zstd CV terms are not settled
+                        compression = "zstd"
+
+                elif tag_code == _TAG_BINARY and binary_elem is None:
                     binary_elem = elem
 
             if array_type is None or binary_elem is None:
@@ -360,7 +665,20 @@ class MzmlFileReader(MassSpecFileReader):
             if not binary_text or not binary_text.strip():
                 continue
 
-            decoded_array = binary_decode(binary_text, precision, compression)
+            if not decode:
+                encoded_arrays[array_type] = (
+                    binary_text,
+                    precision,
+                    compression,
+                    array_length,
+                )
+                if len(encoded_arrays) >= 2:
+                    break
+                continue
+
+            decoded_array = binary_decode(
+                binary_text, precision, compression, array_length
+            )
             # Check if decoding succeeded
             if decoded_array is not None and decoded_array.size > 0:
                 if array_type == "mz":
@@ -383,51 +701,68 @@ class MzmlFileReader(MassSpecFileReader):
             "isolation_window": isolation_window,
             "mz_array": mz_array,
             "intensity_array": intensity_array,
+            "encoded_arrays": encoded_arrays,
+        }
+
+    @staticmethod
+    def _alloc_meta_cols(n: int) -> Dict[str, np.ndarray]:
+        return {
+            "frame_num": np.empty(n, dtype=np.uint32),
+            "mz_lo": np.empty(n, dtype=np.float32),
+            "mz_hi": np.empty(n, dtype=np.float32),
+            "time_in_seconds": np.empty(n, dtype=np.float32),
+            "ms_level": np.empty(n, dtype=np.uint8),
+            "isolation_min_mz": np.empty(n, dtype=np.float32),
+            "isolation_max_mz": np.empty(n, dtype=np.float32),
         }
 
-    def _spec_to_meta(self, spectrum_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert spectrum data to metadata dictionary."""
-        frame = spectrum_data["index"]
-        time_sec = spectrum_data.get("scan_time", 0.0)
-        mslev = spectrum_data.get("ms_level", 1)
+    @staticmethod
+    def _grow_meta_cols(cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        return {k: np.concatenate([v, np.empty_like(v)]) for k, v in cols.items()}
 
+    def _fill_meta(
+        self, cols: Dict[str, np.ndarray], i: int, spectrum_data: Dict[str, Any]
+    ) -> None:
+        """Writes the metadata of one spectrum into row ``i`` of ``cols``."""
         scan_window = spectrum_data.get("scan_window", {})
-        mz_lo = scan_window.get("scan window lower limit", 0.0)
-        mz_hi = scan_window.get("scan window upper limit", 0.0)
-
+        # missing isolation bounds stay NaN and are nulled in _build_meta_df
         isolation_window = spectrum_data.get("isolation_window") or {}
-        isolation_min_mz = isolation_window.get("isolation_min_mz")
-        isolation_max_mz = isolation_window.get("isolation_max_mz")
 
-        return {
-            "frame_num": np.uint32(frame),
-            "mz_lo": np.float32(mz_lo),
-            "mz_hi": np.float32(mz_hi),
-            "time_in_seconds": np.float32(time_sec),
-            "ms_level": np.uint8(mslev),
-            "isolation_min_mz": isolation_min_mz,
-            "isolation_max_mz": isolation_max_mz,
-        }
+        cols["frame_num"][i] = spectrum_data["index"]
+        cols["mz_lo"][i] = scan_window.get("scan window lower limit", 0.0)
+        cols["mz_hi"][i] = scan_window.get("scan window upper limit", 0.0)
+        cols["time_in_seconds"][i] = spectrum_data.get("scan_time", 0.0)
+        cols["ms_level"][i] = spectrum_data.get("ms_level", 1)
+        cols["isolation_min_mz"][i] = isolation_window.get("isolation_min_mz", np.nan)
+        cols["isolation_max_mz"][i] = isolation_window.get("isolation_max_mz", np.nan)
 
     def _parse_spectra(
         self,
         collect_meta: bool,
         progress=None,
-    ) -> Tuple[List[PeakArray], List[Dict[str, Any]]]:
-        """Fast spectrum parsing with minimal overhead using lxml optimizations."""
-        peaks_list: List[PeakArray] = []
-        meta_rows: List[Dict[str, Any]] = []
-
-        with self._open_file_handle() as f:
-            # Try to use lxml tag filtering for major performance boost
-            try:
-                # lxml tag filtering - proven speedup
-                context = ET.iterparse(f, events=("end",), tag="{*}spectrum")
-                use_filter = True
-            except (TypeError, ValueError):
-                # Fallback for non-lxml parsers
-                context = ET.iterparse(f, events=("end",))
-                use_filter = False
+        builder: Optional[PeakArrayBuilder] = None,
+    ) -> Optional[pl.DataFrame]:
+        """
+        Streams the spectra once; peaks are appended to ``builder`` (if given)
+        as each ``<spectrum>`` is parsed, so no per-frame arrays are kept.
+        Metadata goes into preallocated numpy columns; the meta_df is
+        returned when ``collect_meta`` is set.
+
+        With ``num_workers > 1`` the binary arrays are decoded by a thread
+        pool (base64 and inflate release the GIL) while this thread keeps
+        parsing XML; results are packed into ``builder`` in spectrum order.
+        """
+        cols = self._alloc_meta_cols(self.num_spectra or 1024) if collect_meta else None
+        num_frames = 0
+
+        executor = None
+        pending = deque()
+        if builder is not None and self.num_workers > 1:
+            executor = ThreadPoolExecutor(max_workers=self.num_workers)
+        max_pending = 4 * self.num_workers
+
+        with self._open_file_handle() as f, executor or nullcontext():
+            context, use_filter = self._iterparse_spectra(f)
 
             for event, elem in self._progress(
                 context, progress=progress, desc="parse spectra"
@@ -437,21 +772,39 @@ class MzmlFileReader(MassSpecFileReader):
                     elem.clear()
                     continue
 
-                spectrum_data = self._parse_spectrum_element(elem)
+                # a metadata-only pass never needs the decoded arrays
+                spectrum_data = self._parse_spectrum_element(
+                    elem, decode=builder is not None and executor is None
+                )
 
-                if spectrum_data is not None:
-                    # Use fast processing
-                    mz, ab = fast_process_peaks(
-                        spectrum_data["mz_array"], spectrum_data["intensity_array"]
+                if executor is not None:
+                    pending.append(
+                        None
+                        if spectrum_data is None
+                        else executor.submit(
+                            decode_binary_arrays, spectrum_data["encoded_arrays"]
+                        )
                     )
-                    peaks_list.append(PeakArray(mz, ab))
-
-                    if collect_meta:
-                        meta_rows.append(self._spec_to_meta(spectrum_data))
-                else:
-                    peaks_list.append(PeakArray.empty())
-                    if collect_meta:
-                        meta_rows.append(self._create_empty_meta(len(peaks_list) - 1))
+                    while len(pending) > max_pending:
+                        self._pack_future(pending.popleft(), builder)
+                elif builder is not None:
+                    if spectrum_data is None:
+                        builder.commit(0)
+                    else:
+                        self._pack_into(
+                            spectrum_data["mz_array"],
+                            spectrum_data["intensity_array"],
+                            builder,
+                        )
+
+                if collect_meta:
+                    if num_frames == len(cols["frame_num"]):
+                        cols = self._grow_meta_cols(cols)
+                    if spectrum_data is not None:
+                        self._fill_meta(cols, num_frames, spectrum_data)
+                    else:
+                        self._fill_empty_meta(cols, num_frames)
+                num_frames += 1
 
                 # Efficient memory cleanup
                 elem.clear()
@@ -462,24 +815,51 @@ class MzmlFileReader(MassSpecFileReader):
                     except (ValueError, TypeError):
                         pass
 
-        return peaks_list, meta_rows
+            while pending:
+                self._pack_future(pending.popleft(), builder)
 
-    def _create_empty_meta(self, frame_num: int) -> Dict[str, Any]:
-        """Create empty metadata entry."""
-        return {
-            "frame_num": np.uint32(frame_num),
-            "mz_lo": np.float32(0.0),
-            "mz_hi": np.float32(0.0),
-            "time_in_seconds": np.float32(0.0),
-            "ms_level": np.uint8(1),
-            "isolation_min_mz": None,
-            "isolation_max_mz": None,
-        }
+        return self._build_meta_df(cols, num_frames) if collect_meta else None
+
+    @classmethod
+    def _pack_future(cls, future, builder: PeakArrayBuilder) -> None:
+        if future is None:
+            builder.commit(0)
+        else:
+            cls._pack_into(*future.result(), builder)
+
+    @staticmethod
+    def _pack_into(mz_arr, ab_arr, builder: PeakArrayBuilder) -> None:
+        """Writes the positive-intensity peaks straight into the builder's buffer."""
+        if mz_arr is None or ab_arr is None:
+            builder.commit(0)
+            return
+        out = builder.reserve(min(mz_arr.size, ab_arr.size))
+        builder.commit(pack_peaks(mz_arr, ab_arr, out.mz, out.ab))
+
+    @staticmethod
+    def _fill_empty_meta(cols: Dict[str, np.ndarray], i: int) -> None:
+        """Placeholder row for a spectrum that could not be parsed."""
+        cols["frame_num"][i] = i
+        cols["mz_lo"][i] = 0.0
+        cols["mz_hi"][i] = 0.0
+        cols["time_in_seconds"][i] = 0.0
+        cols["ms_level"][i] = 1
+        cols["isolation_min_mz"][i] = np.nan
+        cols["isolation_max_mz"][i] = np.nan
+
+    @staticmethod
+    def _build_meta_df(cols: Dict[str, np.ndarray], n: int) -> pl.DataFrame:
+        meta_df = pl.DataFrame(
+            {k: v[:n] for k, v in cols.items()}, schema=META_SCHEMA
+        ).with_columns(pl.col("isolation_min_mz", "isolation_max_mz").fill_nan(None))
+        # lets polars skip sortedness checks and use binary search on frame_num
+        if meta_df["frame_num"].is_sorted():
+            meta_df = meta_df.with_columns(pl.col("frame_num").set_sorted())
+        return meta_df
 
     def _read_meta(self) -> pl.DataFrame:
         """Read metadata for all spectra."""
-        _, meta_rows = self._parse_spectra(collect_meta=True)
-        return pl.DataFrame(meta_rows, schema=META_SCHEMA)
+        return self._parse_spectra(collect_meta=True)
 
     def get_meta_df(self) -> pl.DataFrame:
         """Get metadata DataFrame, cached after first call."""
@@ -490,31 +870,35 @@ class MzmlFileReader(MassSpecFileReader):
     def load(self, progress=None) -> MassSpecData:
         """Load complete mass spectrometry data."""
         need_meta = self._meta_df is None
-        peaks_list, meta_rows = self._parse_spectra(
-            collect_meta=need_meta, progress=progress
+        # size the buffer up front so it is never regrown while loading
+        capacity = self._total_array_length()
+        builder = PeakArrayBuilder() if capacity is None else PeakArrayBuilder(capacity)
+        meta_df = self._parse_spectra(
+            collect_meta=need_meta, progress=progress, builder=builder
         )
 
         if need_meta:
-            self._meta_df = pl.DataFrame(meta_rows, schema=META_SCHEMA)
+            self._meta_df = meta_df
 
-        return MassSpecData.create(
-            run_name=self.run_name, meta_df=self._meta_df, list_of_peaks=peaks_list
-        )
+        return MassSpecData.from_builder(self.run_name, self._meta_df, builder)
 
-    def get_frame(self, frame_num: int) -> PeakArray:
+    def _read_frame(self, frame_num: int) -> PeakArray:
         # """Get peaks for a specific frame number."""
         # raise NotImplementedError(
         #     "get_frame not implemented for streaming reader. Use load() instead."
         # )
         target_index = int(frame_num)
 
-        with self._open_file_handle() as f:
+        if self._get_spectrum_offsets() is not None:
             try:
-                context = ET.iterparse(f, events=("end",), tag="{*}spectrum")
-                use_filter = True
-            except Exception:
-                context = ET.iterparse(f, events=("end",))
-                use_filter = False
+                with self._mmap_file() as mm:
+                    return self._read_frame_at(mm, target_index)
+            except _STALE_INDEX_ERRORS:
+                # the index does not match the file; stream from now on
+                self._spectrum_offsets = None
+
+        with self._open_file_handle() as f:
+            context, use_filter = self._iterparse_spectra(f)
 
             cur_index = -1
             for event, elem in context:
@@ -550,12 +934,7 @@ class MzmlFileReader(MassSpecFileReader):
         return PeakArray.empty()
 
     def _iter_spectrum_elements(self, f):
-        try:
-            context = ET.iterparse(f, events=("end",), tag="{*}spectrum")
-            use_filter = True
-        except Exception:
-            context = ET.iterparse(f, events=("end",))
-            use_filter = False
+        context, use_filter = self._iterparse_spectra(f)
 
         for event, elem in context:
             if not use_filter and self._get_local_tag(elem.tag) != "spectrum":
@@ -572,16 +951,34 @@ class MzmlFileReader(MassSpecFileReader):
                 except Exception:
                     pass
 
-    def get_frames(self, frame_nums: Sequence[int]) -> List[PeakArray]:
-        """Single-pass streaming read for multiple frames."""
+    def _read_frames(self, frame_nums: Sequence[int]) -> List[PeakArray]:
+        """
+        Single-pass streaming read for multiple frames. Results follow the
+        order of ``frame_nums`` (duplicates included); frames past the end
+        of the file come back empty, as in `get_frame`.
+        """
         frame_nums = np.asarray(frame_nums, dtype=np.int64)
         if frame_nums.size == 0:
             return []
 
-        target_set = set(int(x) for x in frame_nums)
-        remaining = set(target_set)
-        max_target = max(target_set)
-        results: List[PeakArray] = []
+        # sorted unique targets, matched against the spectrum stream in order
+        targets, inverse = np.unique(frame_nums, return_inverse=True)
+        targets = targets.tolist()
+        inverse = inverse.ravel().tolist()
+
+        if self._get_spectrum_offsets() is not None:
+            try:
+                with self._mmap_file() as mm:
+                    found = [
+                        self._read_frame_at(mm, t)
+                        for t in self._progress(targets, desc="load spectra")
+                    ]
+                return [found[k] for k in inverse]
+            except _STALE_INDEX_ERRORS:
+                self._spectrum_offsets = None
+
+        found = [PeakArray.empty()] * len(targets)
+        j = 0
 
         with self._open_file_handle() as f:
             spec_idx = -1
@@ -590,23 +987,45 @@ class MzmlFileReader(MassSpecFileReader):
             ):
                 spec_idx += 1
 
-                if spec_idx > max_target:
+                while j < len(targets) and targets[j] < spec_idx:
+                    j += 1
+                if j == len(targets):
                     break
-
-                if spec_idx not in target_set:
+                if targets[j] != spec_idx:
                     continue
 
                 spectrum_data = self._parse_spectrum_element(spec_elem)
-                if spectrum_data is None:
-                    results.append(PeakArray.empty())
-                else:
-                    mz, ab = fast_process_peaks(
-                        spectrum_data["mz_array"], spectrum_data["intensity_array"]
+                if spectrum_data is not None:
+                    found[j] = PeakArray(
+                        *fast_process_peaks(
+                            spectrum_data["mz_array"], spectrum_data["intensity_array"]
+                        )
                     )
-                    results.append(PeakArray(mz, ab))
+                j += 1
 
-                remaining.discard(spec_idx)
-                if not remaining:
-                    break
+        return [found[k] for k in inverse]
+
+    def _frames_capacity(self, frame_nums: List[int]) -> Optional[int]:
+        return self._total_array_length(frame_nums)
 
-        return results
+    def _read_frames_into(self, frame_nums: List[int], builder: PeakArrayBuilder):
+        """With offsets, packs each spectrum straight into ``builder``."""
+        if self._get_spectrum_offsets() is not None:
+            num_frames = builder.num_frames
+            try:
+                with self._mmap_file() as mm:
+                    for spec_idx in self._progress(frame_nums, desc="load spectra"):
+                        spectrum_data = self._parse_spectrum_at(mm, spec_idx)
+                        if spectrum_data is None:
+                            builder.commit(0)
+                        else:
+                            self._pack_into(
+                                spectrum_data["mz_array"],
+                                spectrum_data["intensity_array"],
+                                builder,
+                            )
+                return
+            except _STALE_INDEX_ERRORS:
+                self._spectrum_offsets = None
+                builder.rewind(num_frames)
+        super()._read_frames_into(frame_nums, builder)
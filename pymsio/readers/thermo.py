@@ -1,14 +1,17 @@
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
 
 import numpy as np
 import polars as pl
-from pathlib import Path
-from collections import defaultdict
-from typing import Sequence, Union, List, Optional, Dict, Any
+from typing import Union, List, Optional, Dict
 
 from pymsio.readers.base import MassSpecFileReader
-from pymsio.readers.ms_data import MassSpecData, PeakArray
+from pymsio.readers.ms_data import MassSpecData, PeakArray, PeakArrayBuilder
+from pymsio.readers.utils import pack_peaks, DotNetArrayView
 
 ENV_DLL_DIR = "PYMSIO_THERMO_DLL_DIR"
 REQUIRED_DLLS = [
@@ -44,29 +47,45 @@ def find_thermo_dll_dir() -> Path:
     )
 
 
-LOADED_DLL = False
-_DLL_LOAD_ERROR: str = ""
+@lru_cache(maxsize=None)
+def _load_thermo_dlls() -> str:
+    """
+    Starts pythonnet, loads the Thermo assemblies and binds the .NET names
+    used by this module, once per process. Called on first use rather than
+    at import, so mzML-only users never start the .NET runtime.
+
+    Returns:
+        str: "" on success, otherwise the error that stopped the load
+    """
+    global System, ThermoFisher, RawFileReaderAdapter, IScanEventBase, ScanDataType
 
-try:
-    import clr
+    try:
+        import clr
 
-    clr.AddReference("System")
-    import System
+        clr.AddReference("System")
+        import System
 
-    from pymsio.readers.utils import DotNetArrayToNPArray
+        dll_dir = find_thermo_dll_dir()
 
-    dll_dir = find_thermo_dll_dir()
+        for filename in REQUIRED_DLLS:
+            clr.AddReference(os.path.join(dll_dir, filename))
 
-    for filename in REQUIRED_DLLS:
-        clr.AddReference(os.path.join(dll_dir, filename))
+        import ThermoFisher
+        from ThermoFisher.CommonCore.RawFileReader import RawFileReaderAdapter
+        from ThermoFisher.CommonCore.Data.Interfaces import IScanEventBase
+        from ThermoFisher.CommonCore.Data.FilterEnums import ScanDataType
+    except Exception as exc:
+        return f"{type(exc).__name__}: {exc}"
+    return ""
 
-    import ThermoFisher
-    from ThermoFisher.CommonCore.RawFileReader import RawFileReaderAdapter
-    from ThermoFisher.CommonCore.Data.Interfaces import IScanEvent, IScanEventBase
 
-    LOADED_DLL = True
-except Exception as exc:
-    _DLL_LOAD_ERROR = f"{type(exc).__name__}: {exc}"
+def __getattr__(name: str):
+    # LOADED_DLL / _DLL_LOAD_ERROR trigger the (cached) DLL load on access
+    if name == "LOADED_DLL":
+        return not _load_thermo_dlls()
+    if name == "_DLL_LOAD_ERROR":
+        return _load_thermo_dlls()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class ThermoRawReader(MassSpecFileReader):
@@ -77,8 +96,9 @@ class ThermoRawReader(MassSpecFileReader):
         filepath: Union[str, Path],
         num_workers: int = 0,
     ):
-        if not LOADED_DLL:
-            raise RuntimeError(f"Failed to load Thermo DLLs: {_DLL_LOAD_ERROR}")
+        dll_load_error = _load_thermo_dlls()
+        if dll_load_error:
+            raise RuntimeError(f"Failed to load Thermo DLLs: {dll_load_error}")
 
         super().__init__(filepath, num_workers)
 
@@ -87,6 +107,9 @@ class ThermoRawReader(MassSpecFileReader):
         self._raw.SelectInstrument(ThermoFisher.CommonCore.Data.Business.Device.MS, 1)
 
         self._meta_df: Optional[pl.DataFrame] = None
+        # per-scan centroid flags taken from the scan events read with the meta
+        self._centroid_flags: Optional[np.ndarray] = None
+        self._first_scan = self.first_scan_number
 
     def close(self):
         if self._raw is not None:
@@ -121,35 +144,101 @@ class ThermoRawReader(MassSpecFileReader):
             " -> ", self._raw.GetAllInstrumentNamesFromInstrumentMethod()
         )
 
-    def _read_peaks_arrays(self, frame_num: int) -> PeakArray:
-        is_centroid = self._raw.IsCentroidScanFromScanNumber(frame_num)
+    def _is_centroid(self, frame_num: int) -> bool:
+        if self._centroid_flags is not None:
+            idx = frame_num - self._first_scan
+            # a negative index would wrap around to another scan's flag
+            if 0 <= idx < len(self._centroid_flags):
+                return bool(self._centroid_flags[idx])
+        return self._raw.IsCentroidScanFromScanNumber(frame_num)
+
+    def _read_scan_data(self, frame_num: int, is_centroid: Optional[bool] = None):
+        if is_centroid is None:
+            is_centroid = self._is_centroid(frame_num)
 
         if not is_centroid:
-            data = self._raw.GetSimplifiedCentroids(frame_num)
-        else:
-            data = self._raw.GetSimplifiedScan(frame_num)
+            return self._raw.GetSimplifiedCentroids(frame_num)
+        return self._raw.GetSimplifiedScan(frame_num)
+
+    @staticmethod
+    def _num_peaks(data) -> int:
+        return 0 if data.Masses is None else len(data.Masses)
+
+    @staticmethod
+    def _copy_peaks(data, out: PeakArray) -> int:
+        """Copies the peaks with positive intensity to the front of ``out``."""
+        # pinned zero-copy views; cast and filtered in a single pass
+        return pack_peaks(
+            DotNetArrayView(data.Masses),
+            DotNetArrayView(data.Intensities),
+            out.mz,
+            out.ab,
+        )
 
-        mz_arr = DotNetArrayToNPArray(data.Masses, dtype=np.float32)
-        inten_arr = DotNetArrayToNPArray(data.Intensities, dtype=np.float32)
+    def _read_peaks_arrays(self, frame_num: int) -> PeakArray:
+        data = self._read_scan_data(frame_num)
+        num_peaks = self._num_peaks(data)
 
-        if mz_arr is None or len(mz_arr) == 0:
+        if num_peaks == 0:
             return PeakArray.empty()
 
-        mask = inten_arr > 0
-        n = np.count_nonzero(mask)
+        out = PeakArray.allocate(num_peaks)
+        n = self._copy_peaks(data, out)
 
         if n == 0:
             return PeakArray.empty()
 
-        if n == len(mz_arr):
-            return PeakArray(mz_arr, inten_arr)
+        return PeakArray(out.mz[:n], out.ab[:n])
 
-        idx = np.flatnonzero(mask)
-        return PeakArray(mz_arr[idx], inten_arr[idx])
-
-    def _read_scan_meta(self, frame_num: int, cols: Dict[str, list]) -> None:
+    def _read_peaks_into(
+        self,
+        frame_num: int,
+        builder: PeakArrayBuilder,
+        is_centroid: Optional[bool] = None,
+    ) -> None:
+        data = self._read_scan_data(frame_num, is_centroid)
+        num_peaks = self._num_peaks(data)
+
+        n = self._copy_peaks(data, builder.reserve(num_peaks)) if num_peaks > 0 else 0
+        builder.commit(n)
+
+    def _read_scan_events(self, first: int, last: int):
+        """
+        Fetches the scan events of ``first..last`` with one managed call when
+        the RawFileReader build provides ``GetScanEvents``; returns ``None``
+        otherwise so callers fall back to one lookup per scan.
+        """
+        get_scan_events = getattr(self._raw, "GetScanEvents", None)
+        if get_scan_events is None:
+            return None
+        try:
+            scan_events = get_scan_events(first, last)
+        except Exception:
+            return None
+        if scan_events is None or len(scan_events) != last - first + 1:
+            return None
+        return scan_events
+
+    def _alloc_meta_cols(self, first: int, last: int) -> Dict[str, np.ndarray]:
+        n = last - first + 1
+        return {
+            "frame_num": np.arange(first, last + 1, dtype=np.uint32),
+            "mz_lo": np.empty(n, dtype=np.float32),
+            "mz_hi": np.empty(n, dtype=np.float32),
+            "time_in_seconds": np.empty(n, dtype=np.float32),
+            "ms_level": np.empty(n, dtype=np.uint8),
+            "isolation_min_mz": np.full(n, np.nan, dtype=np.float32),
+            "isolation_max_mz": np.full(n, np.nan, dtype=np.float32),
+            "is_centroid": np.empty(n, dtype=bool),
+        }
+
+    def _read_scan_meta(
+        self, frame_num: int, cols: Dict[str, np.ndarray], i: int, scan_event=None
+    ) -> None:
         scan_stats = self._raw.GetScanStatsForScanNumber(frame_num)
-        scan_event = IScanEventBase(self._raw.GetScanEventForScanNumber(frame_num))
+        if scan_event is None:
+            scan_event = self._raw.GetScanEventForScanNumber(frame_num)
+        scan_event = IScanEventBase(scan_event)
 
         try:
             rt = float(scan_stats.StartTime)  # minutes
@@ -158,10 +247,8 @@ class ThermoRawReader(MassSpecFileReader):
 
         ms_level = int(scan_event.MSOrder)
 
-        if ms_level == 1:
-            isolation_min_mz = None
-            isolation_max_mz = None
-        else:
+        # isolation window of MS1 scans stays NaN (nulled in _build_meta_df)
+        if ms_level > 1:
             reaction = scan_event.GetReaction(0)
             if reaction.PrecursorRangeIsValid:
                 isolation_min_mz = reaction.FirstPrecursorMass
@@ -171,17 +258,28 @@ class ThermoRawReader(MassSpecFileReader):
                 isolation_width = float(reaction.IsolationWidth)
                 isolation_min_mz = isolation_center - isolation_width / 2.0
                 isolation_max_mz = isolation_min_mz + isolation_width
-
-        cols["frame_num"].append(frame_num)
-        cols["time_in_seconds"].append(rt * 60)
-        cols["ms_level"].append(ms_level)
-        cols["isolation_min_mz"].append(isolation_min_mz)
-        cols["isolation_max_mz"].append(isolation_max_mz)
-        cols["mz_lo"].append(float(scan_stats.LowMass))
-        cols["mz_hi"].append(float(scan_stats.HighMass))
-
-    def _build_meta_df(self, cols: Dict[str, list]) -> pl.DataFrame:
-        meta_df = pl.DataFrame(cols, schema=self.meta_schema, nan_to_null=True)
+            cols["isolation_min_mz"][i] = isolation_min_mz
+            cols["isolation_max_mz"][i] = isolation_max_mz
+
+        cols["time_in_seconds"][i] = rt * 60
+        cols["ms_level"][i] = ms_level
+        cols["is_centroid"][i] = scan_event.ScanData == ScanDataType.Centroid
+        cols["mz_lo"][i] = float(scan_stats.LowMass)
+        cols["mz_hi"][i] = float(scan_stats.HighMass)
+
+    def _build_meta_df(self, cols: Dict[str, np.ndarray]) -> pl.DataFrame:
+        self._centroid_flags = cols.pop("is_centroid")
+
+        # MS1 rows hold NaN sentinels; null them by ms_level instead of
+        # scanning every float column with nan_to_null
+        meta_df = pl.DataFrame(cols, schema=self.meta_schema).with_columns(
+            *(
+                pl.when(pl.col("ms_level") > 1).then(pl.col(col)).alias(col)
+                for col in ("isolation_min_mz", "isolation_max_mz")
+            ),
+            # scan numbers are consecutive
+            pl.col("frame_num").set_sorted(),
+        )
         self._meta_df = meta_df
         return meta_df
 
@@ -189,37 +287,145 @@ class ThermoRawReader(MassSpecFileReader):
         if self._meta_df is not None:
             return self._meta_df
 
-        cols: Dict[str, list] = defaultdict(list)
-        for frame_num in self._progress(
-            range(self.first_scan_number, self.last_scan_number + 1),
-            desc="read meta",
+        first, last = self.first_scan_number, self.last_scan_number
+        scan_events = self._read_scan_events(first, last)
+
+        cols = self._alloc_meta_cols(first, last)
+        for i, frame_num in enumerate(
+            self._progress(range(first, last + 1), desc="read meta")
         ):
-            self._read_scan_meta(frame_num, cols)
+            scan_event = None if scan_events is None else scan_events[i]
+            self._read_scan_meta(frame_num, cols, i, scan_event)
 
         return self._build_meta_df(cols)
 
-    def get_frame(self, frame_num: int) -> PeakArray:
+    def _read_frame(self, frame_num: int) -> PeakArray:
         return self._read_peaks_arrays(frame_num)
 
-    def get_frames(self, frame_nums: Sequence[int]) -> List[PeakArray]:
+    def _read_frames(self, frame_nums: List[int]) -> List[PeakArray]:
         return [
-            self.get_frame(int(fn))
+            self._read_peaks_arrays(fn)
             for fn in self._progress(frame_nums, desc="load spectra")
         ]
 
+    def _read_frames_into(self, frame_nums: List[int], builder: PeakArrayBuilder):
+        for fn in self._progress(frame_nums, desc="load spectra"):
+            self._read_peaks_into(fn, builder)
+
+    def _read_scan_range(
+        self,
+        first: int,
+        last: int,
+        need_meta: bool,
+        progress=None,
+        centroid_flags: Optional[np.ndarray] = None,
+    ):
+        """
+        ``centroid_flags`` (one per scan of ``first..last``) spares the
+        per-scan centroid probe when the meta was read elsewhere.
+        """
+        cols = self._alloc_meta_cols(first, last) if need_meta else None
+        scan_events = self._read_scan_events(first, last) if need_meta else None
+        builder = PeakArrayBuilder()
+
+        for i, fn in enumerate(
+            self._progress(
+                range(first, last + 1), progress=progress, desc="load spectra"
+            )
+        ):
+            is_centroid = None
+            if need_meta:
+                scan_event = None if scan_events is None else scan_events[i]
+                self._read_scan_meta(fn, cols, i, scan_event)
+                is_centroid = cols["is_centroid"][i]
+            elif centroid_flags is not None:
+                is_centroid = centroid_flags[i]
+            self._read_peaks_into(fn, builder, is_centroid)
+
+        return cols, builder
+
+    def _read_scan_range_parallel(self, need_meta: bool, progress=None):
+        """
+        Reads contiguous scan-number chunks in worker processes, each with its
+        own RawFileReaderAdapter handle (.NET objects cannot be shared across
+        threads), and merges the results in order.
+        """
+        first, last = self.first_scan_number, self.last_scan_number
+        num_scans = last - first + 1
+        if num_scans <= 0:
+            return self._read_scan_range(first, last, need_meta, progress)
+
+        num_chunks = min(self.num_workers * 4, num_scans)
+        bounds = np.linspace(first, last + 1, num_chunks + 1).astype(np.int64)
+        scan_ranges = [(int(a), int(b) - 1) for a, b in zip(bounds[:-1], bounds[1:])]
+
+        # workers have no meta of their own; hand them the centroid flags
+        flags = None if need_meta else self._centroid_flags
+        chunk_flags = [
+            None if flags is None else flags[a - first : b - first + 1]
+            for a, b in scan_ranges
+        ]
+
+        chunk_cols = []
+        builder = PeakArrayBuilder()
+
+        # spawn: forking a process with a live .NET runtime is not safe
+        with ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.filepath,),
+        ) as executor, self._progress_counter(
+            progress, desc="load spectra", total=num_scans
+        ) as advance:
+            results = executor.map(
+                _read_scan_range_worker, scan_ranges, repeat(need_meta), chunk_flags
+            )
+            for cols, mz, ab, peak_counts in results:
+                builder.extend(PeakArray(mz, ab), peak_counts)
+                if need_meta:
+                    chunk_cols.append(cols)
+                # same units as the serial path: one step per scan
+                advance(len(peak_counts))
+
+        cols = None
+        if need_meta:
+            cols = {
+                k: np.concatenate([c[k] for c in chunk_cols]) for k in chunk_cols[0]
+            }
+
+        return cols, builder
+
     def load(self, progress=None) -> MassSpecData:
-        scan_range = range(self.first_scan_number, self.last_scan_number + 1)
         need_meta = self._meta_df is None
 
-        cols: Dict[str, list] = defaultdict(list) if need_meta else {}
-        all_spectra: List[PeakArray] = []
-
-        for fn in self._progress(scan_range, progress=progress, desc="load spectra"):
-            if need_meta:
-                self._read_scan_meta(fn, cols)
-            all_spectra.append(self._read_peaks_arrays(fn))
+        if self.num_workers > 1:
+            cols, builder = self._read_scan_range_parallel(need_meta, progress)
+        else:
+            cols, builder = self._read_scan_range(
+                self.first_scan_number, self.last_scan_number, need_meta, progress
+            )
 
         if need_meta:
             self._build_meta_df(cols)
 
-        return MassSpecData.create(self.run_name, self._meta_df, all_spectra)
+        return MassSpecData.from_builder(self.run_name, self._meta_df, builder)
+
+
+_WORKER_READER: Optional[ThermoRawReader] = None
+
+
+def _init_worker(filepath: str):
+    global _WORKER_READER
+    _WORKER_READER = ThermoRawReader(filepath)
+
+
+def _read_scan_range_worker(
+    scan_range, need_meta: bool, centroid_flags: Optional[np.ndarray] = None
+):
+    first, last = scan_range
+    cols, builder = _WORKER_READER._read_scan_range(
+        first, last, need_meta, centroid_flags=centroid_flags
+    )
+    peaks, peak_start, peak_stop = builder.build()
+    return cols, peaks.mz, peaks.ab, peak_stop - peak_start
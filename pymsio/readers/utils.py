@@ -1,64 +1,274 @@
 import math
-import logging
+from functools import lru_cache
 
 import numpy as np
 import numba as nb
 
-logger = logging.getLogger(__name__)
 
-try:
-    import clr
+@lru_cache(maxsize=None)
+def _get_clr_bindings():
+    """
+    Starts pythonnet on first use, so importing pymsio does not spin up the
+    .NET runtime for mzML-only work.
+
+    Returns:
+        (GCHandle, GCHandleType)
+    """
+    try:
+        import clr
+
+        clr.AddReference("System")
+
+        from System.Runtime.InteropServices import GCHandle, GCHandleType
+    except Exception as e:
+        raise ImportError(
+            f"pythonnet/.NET runtime unavailable ({type(e).__name__}: {e}). "
+            "Install pythonnet and a .NET runtime (Mono on Linux/macOS, see "
+            "install_mono.sh) to read Thermo RAW files."
+        ) from e
+    return GCHandle, GCHandleType
+
 
-    clr.AddReference("System")
+class _PinnedDotNetArray:
+    """
+    Pins a .NET double[] and exposes it through ``__array_interface__``.
+
+    numpy keeps this object as the ``base`` of any array built from it, so
+    the GCHandle is released only when the last view is garbage-collected
+    and the .NET GC cannot move the buffer underneath numpy.
+    """
+
+    def __init__(self, src):
+        GCHandle, GCHandleType = _get_clr_bindings()
+        self._hndl = GCHandle.Alloc(src, GCHandleType.Pinned)
+        self.__array_interface__ = {
+            "version": 3,
+            "shape": (len(src),),
+            "typestr": np.dtype(np.float64).str,
+            "data": (self._hndl.AddrOfPinnedObject().ToInt64(), False),
+        }
 
-    import ctypes
+    def __del__(self):
+        hndl = getattr(self, "_hndl", None)
+        if hndl is not None and hndl.IsAllocated:
+            hndl.Free()
+
+
+def DotNetArrayView(src) -> np.ndarray:
+    """
+    Zero-copy float64 view of a .NET double[].
 
-    from System.Runtime.InteropServices import GCHandle, GCHandleType
-except Exception as e:
-    logger.exception(
-        "pythonnet/.NET runtime import failed. "
-        f"Optional dependency unavailable: pythonnet/.NET import failed ({type(e).__name__}: {e}). "
-        "Thermo RAW reader functionality will be disabled."
-    )
+    pythonnet >= 3 exports primitive arrays through the buffer protocol and
+    pins them while the buffer is held; older runtimes fall back to an
+    explicit GCHandle pin. Either way the array stays pinned for as long as
+    the view (or anything derived from it) is alive; copy or cast it if it
+    is kept around.
+    """
+    if src is None or len(src) == 0:
+        return np.empty(0, dtype=np.float64)
+    try:
+        return np.frombuffer(memoryview(src), dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.asarray(_PinnedDotNetArray(src))
 
 
 def DotNetArrayToNPArray(src, dtype=np.float64):
     """
     See https://mail.python.org/pipermail/pythondotnet/2014-May/001527.html
 
-    GCHandle pins the .NET array and np.frombuffer creates a zero-copy view.
-    The pin is released in `finally`, so we must copy the data before returning;
-    otherwise the numpy array becomes a dangling pointer and may segfault
-    when the .NET GC compacts the heap.
+    Copies a .NET double[] into a new numpy array, casting to ``dtype``
+    (e.g. np.float32) in the same pass. The pin is dropped with the
+    temporary view as soon as the copy is made.
+    """
+    if src is None or len(src) == 0:
+        return np.empty(0, dtype=dtype)
+    return DotNetArrayView(src).astype(dtype, copy=True)
+
 
-    Pass dtype (e.g. np.float32) to convert in a single copy instead of two.
+def DotNetArrayCopyTo(src, dest: np.ndarray) -> None:
     """
-    if src is None:
-        return np.array([], dtype=dtype)
-    src_hndl = GCHandle.Alloc(src, GCHandleType.Pinned)
-    try:
-        src_ptr = src_hndl.AddrOfPinnedObject().ToInt64()
-        bufType = ctypes.c_double * len(src)
-        cbuf = bufType.from_address(src_ptr)
-        dest = np.array(cbuf, dtype=dtype)  # copy + convert while pinned
-    finally:
-        if src_hndl.IsAllocated:
-            src_hndl.Free()
-    return dest
+    Same as `DotNetArrayToNPArray`, but copies (and casts) the .NET double[]
+    into the caller's buffer, e.g. a slice of a preallocated peak array,
+    so no per-call numpy array is allocated. ``len(dest)`` must match ``len(src)``.
+    """
+    if src is None or len(src) == 0:
+        return
+    np.copyto(dest, DotNetArrayView(src), casting="same_kind")
+
+
+class FrameNumIndex:
+    """
+    Maps frame numbers to row indices of a meta_df.
+
+    Contiguous frame numbers (the usual Thermo/mzML case) resolve with a
+    single subtraction; gapped ones fall back to a lookup table of size
+    ``max(frame_num) + 1``. Either way an unknown frame number raises
+    IndexError.
+    """
+
+    # lookup-table entry of a frame number that is not in the index
+    _MISSING = np.iinfo(np.uint32).max
+
+    def __init__(self, frame_nums):
+        frame_nums = np.asarray(frame_nums, dtype=np.int64)
+        self.num_frames = len(frame_nums)
+        self.first_frame = int(frame_nums[0]) if self.num_frames > 0 else 0
+        self._lookup_arr = None
+
+        is_contiguous = self.num_frames == 0 or (
+            frame_nums[-1] - frame_nums[0] + 1 == self.num_frames
+            and np.all(np.diff(frame_nums) == 1)
+        )
+        if not is_contiguous:
+            num_to_idx = np.full(frame_nums.max() + 1, self._MISSING, dtype=np.uint32)
+            num_to_idx[frame_nums] = np.arange(self.num_frames, dtype=np.uint32)
+            self._lookup_arr = num_to_idx
 
+    @property
+    def is_contiguous(self) -> bool:
+        return self._lookup_arr is None
 
-def get_frame_num_to_index_arr(frame_nums):
-    num_to_idx = np.zeros(frame_nums[-1] + 1, dtype=np.uint32)
-    num_to_idx[frame_nums] = np.arange(len(frame_nums), dtype=np.uint32)
-    return num_to_idx
+    def lookup(self, frame_num):
+        if self._lookup_arr is not None:
+            return self._lookup_gapped(frame_num)
 
+        if np.isscalar(frame_num):
+            idx = int(frame_num) - self.first_frame
+            if not 0 <= idx < self.num_frames:
+                raise IndexError(f"frame_num {frame_num} is out of range")
+            return idx
 
-@nb.njit(cache=True, fastmath=True)
+        idx = np.asarray(frame_num, dtype=np.int64) - self.first_frame
+        if idx.size > 0 and (idx.min() < 0 or idx.max() >= self.num_frames):
+            raise IndexError("frame_num is out of range")
+        return idx
+
+    def _lookup_gapped(self, frame_num):
+        lookup_arr = self._lookup_arr
+        if np.isscalar(frame_num):
+            fn = int(frame_num)
+            if 0 <= fn < len(lookup_arr) and lookup_arr[fn] != self._MISSING:
+                return int(lookup_arr[fn])
+            raise IndexError(f"frame_num {frame_num} is not in the index")
+
+        fn = np.asarray(frame_num, dtype=np.int64)
+        if fn.size > 0 and (fn.min() < 0 or fn.max() >= len(lookup_arr)):
+            raise IndexError("frame_num is out of range")
+        idx = lookup_arr[fn]
+        if np.any(idx == self._MISSING):
+            raise IndexError("frame_num is not in the index")
+        return idx
+
+    __getitem__ = lookup
+
+
+def get_frame_num_to_index_arr(frame_nums) -> FrameNumIndex:
+    return FrameNumIndex(frame_nums)
+
+
+def concat_ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Concatenation of ``arange(starts[i], starts[i] + lengths[i])`` for all i,
+    built without a Python loop.
+    """
+    out_starts = np.cumsum(lengths) - lengths
+    total = int(lengths.sum())
+    return np.repeat(starts - out_starts, lengths) + np.arange(total, dtype=np.int64)
+
+
+@nb.njit(cache=True, nogil=True)
+def pack_peaks(mz_arr, ab_arr, out_mz, out_ab, min_intensity=0.0) -> int:
+    """
+    Copies the peaks with ``ab > min_intensity`` to the front of the float32
+    ``out_mz``/``out_ab`` in one pass, casting from any float input dtype.
+    The outputs need room for ``min(len(mz_arr), len(ab_arr))`` peaks.
+
+    Returns:
+        int: number of peaks written
+    """
+    n = min(mz_arr.shape[0], ab_arr.shape[0])
+    k = 0
+    # branchless: always write, only advance past kept peaks
+    for i in range(n):
+        ab = ab_arr[i]
+        out_mz[k] = mz_arr[i]
+        out_ab[k] = ab
+        k += ab > min_intensity
+    return k
+
+
+@nb.njit(cache=True, fastmath=True, inline="always")
 def _norm_cdf(z: float) -> float:
     return 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
 
 
-@nb.njit(parallel=True, fastmath=True, cache=True)
+@nb.njit(cache=True)
+def _select_kth(buf: np.ndarray, lo: int, hi: int, k: int) -> float:
+    """In-place quickselect: places the k-th smallest of buf[lo:hi+1] at buf[k]."""
+    while lo < hi:
+        pivot = buf[(lo + hi) // 2]
+        i = lo
+        j = hi
+        while i <= j:
+            while buf[i] < pivot:
+                i += 1
+            while buf[j] > pivot:
+                j -= 1
+            if i <= j:
+                tmp = buf[i]
+                buf[i] = buf[j]
+                buf[j] = tmp
+                i += 1
+                j -= 1
+        if k <= j:
+            hi = j
+        elif k >= i:
+            lo = i
+        else:
+            break
+    return buf[k]
+
+
+@nb.njit(cache=True)
+def _min_range(buf: np.ndarray, lo: int, hi: int) -> float:
+    m = buf[lo]
+    for i in range(lo + 1, hi):
+        if buf[i] < m:
+            m = buf[i]
+    return m
+
+
+@nb.njit(cache=True)
+def _quartiles(buf: np.ndarray):
+    """
+    Linear-interpolated 25/50/75% quantiles (same as np.quantile) of buf,
+    which is reordered in place. The median is selected first so Q1 and Q3
+    only need to search their own half.
+    """
+    n = buf.shape[0]
+    p1 = 0.25 * (n - 1)
+    p2 = 0.5 * (n - 1)
+    p3 = 0.75 * (n - 1)
+    k1 = int(p1)
+    k2 = int(p2)
+    k3 = int(p3)
+
+    v2 = _select_kth(buf, 0, n - 1, k2)
+    v3 = _select_kth(buf, k2 + 1, n - 1, k3) if k3 > k2 else v2
+    v1 = _select_kth(buf, 0, k2 - 1, k1) if k1 < k2 else v2
+
+    # (k+1)-th order statistics for the interpolation
+    n3 = _min_range(buf, k3 + 1, n) if k3 + 1 < n else v3
+    n2 = _min_range(buf, k2 + 1, k3 + 1) if k3 > k2 else n3
+    n1 = _min_range(buf, k1 + 1, k2 + 1) if k2 > k1 else n2
+
+    q1 = v1 + (n1 - v1) * (p1 - k1)
+    q2 = v2 + (n2 - v2) * (p2 - k2)
+    q3 = v3 + (n3 - v3) * (p3 - k3)
+    return q1, q2, q3
+
+
+@nb.njit(parallel=True, fastmath=True, cache=True, nogil=True)
 def compute_z_score_cdf_numba(
     ab_arr: np.ndarray, peak_range_arr: np.ndarray
 ) -> np.ndarray:
@@ -77,9 +287,8 @@ def compute_z_score_cdf_numba(
         st = int(peak_range_arr[i, 0])
         ed = int(peak_range_arr[i, 1])
         if ed > st:
-            ab = ab_arr[st:ed]
-            # Numba(>=0.47)
-            q1, q2, q3 = np.quantile(ab, np.array([0.25, 0.5, 0.75]))
+            # per-frame scratch copy, reordered by the selection
+            q1, q2, q3 = _quartiles(ab_arr[st:ed].astype(np.float64))
             iqr = q3 - q1
             if iqr > 0.0:
                 inv = 1.0 / iqr
@@ -0,0 +1,364 @@
+import math
+from array import array
+
+import h5py
+import numpy as np
+import polars as pl
+import pytest
+
+import pymsio.readers.ms_data as ms_data_module
+from pymsio.readers.ms_data import (
+    MassSpecData,
+    PeakArray,
+    PeakArrayBuilder,
+    PeakBufferPool,
+    META_SCHEMA,
+)
+from pymsio.readers.utils import pack_peaks, DotNetArrayView, DotNetArrayCopyTo
+
+
+def _make_meta_df(frame_nums) -> pl.DataFrame:
+    n = len(frame_nums)
+    return pl.DataFrame(
+        {
+            "frame_num": frame_nums,
+            "mz_lo": [100.0] * n,
+            "mz_hi": [2000.0] * n,
+            "time_in_seconds": [float(i) for i in range(n)],
+            "ms_level": [1 if i % 2 == 0 else 2 for i in range(n)],
+            "isolation_min_mz": [None if i % 2 == 0 else 500.0 for i in range(n)],
+            "isolation_max_mz": [None if i % 2 == 0 else 502.0 for i in range(n)],
+        },
+        schema=META_SCHEMA,
+    )
+
+
+def _make_peaks(counts):
+    rng = np.random.default_rng(42)
+    return [
+        PeakArray(
+            np.sort(rng.uniform(100, 2000, n)).astype(np.float32),
+            rng.uniform(1, 1000, n).astype(np.float32),
+        )
+        for n in counts
+    ]
+
+
+def _make_ms_data(frame_nums=None, counts=(3, 0, 5, 1, 4)):
+    if frame_nums is None:
+        frame_nums = range(1, len(counts) + 1)
+    list_of_peaks = _make_peaks(counts)
+    ms_data = MassSpecData.create("run", _make_meta_df(list(frame_nums)), list_of_peaks)
+    return ms_data, list_of_peaks
+
+
+class TestMassSpecData:
+
+    def test_create(self):
+        ms_data, list_of_peaks = _make_ms_data()
+
+        assert ms_data.peaks.mz.dtype == np.float32
+        assert ms_data.peaks.ab.dtype == np.float32
+        assert len(ms_data.peaks) == sum(len(p) for p in list_of_peaks)
+        assert ms_data.meta_df["peak_start"].to_list() == [0, 3, 3, 8, 9]
+        assert ms_data.meta_df["peak_stop"].to_list() == [3, 3, 8, 9, 13]
+
+    def test_create_empty(self):
+        ms_data = MassSpecData.create("run", _make_meta_df([]), [])
+        assert len(ms_data.peaks) == 0
+
+    def test_get_frame(self):
+        ms_data, list_of_peaks = _make_ms_data()
+
+        assert ms_data.frame_num_to_index.is_contiguous
+        for frame_num, expected in zip((1, 2, 3, 4, 5), list_of_peaks):
+            peaks = ms_data.get_frame(frame_num)
+            np.testing.assert_array_equal(peaks.mz, expected.mz)
+            np.testing.assert_array_equal(peaks.ab, expected.ab)
+
+    def test_get_frame_gapped(self):
+        ms_data, list_of_peaks = _make_ms_data(frame_nums=(2, 4, 5, 9, 10))
+
+        assert not ms_data.frame_num_to_index.is_contiguous
+        for frame_num, expected in zip((2, 4, 5, 9, 10), list_of_peaks):
+            np.testing.assert_array_equal(ms_data.get_frame(frame_num).mz, expected.mz)
+
+        # holes and frame numbers past either end are not silently remapped
+        for frame_num in (3, 0, 11, -1):
+            with pytest.raises(IndexError):
+                ms_data.get_frame(frame_num)
+        with pytest.raises(IndexError):
+            ms_data.frame_num_to_index.lookup(np.array([4, 6]))
+
+    def test_get_all_peak_df(self):
+        ms_data, list_of_peaks = _make_ms_data()
+        peak_df = ms_data.get_all_peak_df()
+
+        assert peak_df.schema["frame_num"] == pl.UInt32
+        assert peak_df["frame_num"].to_list() == [1] * 3 + [3] * 5 + [4] + [5] * 4
+        np.testing.assert_array_equal(peak_df["mz"].to_numpy(), ms_data.peaks.mz)
+
+    def test_compute_z_score(self):
+        ms_data, _ = _make_ms_data(counts=(3, 0, 5, 1, 4, 2, 10))
+        ms_data.compute_z_score()
+
+        expected = np.full(len(ms_data.peaks), 0.5)
+        for st, ed in ms_data.meta_df.select("peak_start", "peak_stop").iter_rows():
+            if ed > st:
+                ab = ms_data.peaks.ab[st:ed]
+                q1, q2, q3 = np.quantile(ab, [0.25, 0.5, 0.75])
+                if q3 > q1:
+                    z = (ab - q2) / (q3 - q1)
+                    expected[st:ed] = [
+                        0.5 * (1 + math.erf(v / math.sqrt(2))) for v in z
+                    ]
+
+        np.testing.assert_allclose(ms_data.z_score_arr, expected, rtol=1e-5)
+
+    def test_collect_peaks(self):
+        ms_data, list_of_peaks = _make_ms_data()
+        ms_data.compute_z_score()
+
+        frame_num_arr, mz_out, ab_out, z_out = ms_data.collect_peaks([5, 2, 1])
+
+        assert frame_num_arr.tolist() == [5] * 4 + [1] * 3
+        np.testing.assert_array_equal(
+            mz_out, np.concatenate([list_of_peaks[4].mz, list_of_peaks[0].mz])
+        )
+        np.testing.assert_array_equal(
+            ab_out, np.concatenate([list_of_peaks[4].ab, list_of_peaks[0].ab])
+        )
+        np.testing.assert_array_equal(
+            z_out, np.concatenate([ms_data.z_score_arr[9:13], ms_data.z_score_arr[0:3]])
+        )
+
+    def test_to_arrow(self):
+        pytest.importorskip("pyarrow")
+        ms_data, _ = _make_ms_data()
+
+        arr = ms_data.to_arrow()
+        assert arr.type.names == ["mz", "ab"]
+        np.testing.assert_array_equal(arr.field("ab").to_numpy(), ms_data.peaks.ab)
+
+        peak_df = ms_data.to_polars()
+        assert peak_df.schema == {"mz": pl.Float32, "ab": pl.Float32}
+        assert np.shares_memory(peak_df["mz"].to_numpy(), ms_data.peaks.mz)
+
+    def test_write_read_hdf(self, tmp_path):
+        ms_data, _ = _make_ms_data()
+        file_path = tmp_path / "ms_data.h5"
+        ms_data.write_hdf(file_path)
+
+        loaded = MassSpecData.read_hdf(file_path, "run")
+
+        assert loaded.meta_df.equals(ms_data.meta_df)
+        np.testing.assert_array_equal(loaded.peaks.mz, ms_data.peaks.mz)
+        np.testing.assert_array_equal(loaded.peaks.ab, ms_data.peaks.ab)
+
+    def test_read_hdf_pandas_layout(self, tmp_path):
+        pytest.importorskip("tables")
+        ms_data, _ = _make_ms_data()
+        file_path = tmp_path / "ms_data.h5"
+        # layout written before the ``format`` attribute existed
+        with h5py.File(file_path, "a") as hf:
+            hf_grp = hf.create_group("run")
+            hf_grp.create_dataset("mz", data=ms_data.peaks.mz)
+            hf_grp.create_dataset("ab", data=ms_data.peaks.ab)
+        ms_data.meta_df.to_pandas().to_hdf(file_path, key="run/meta_df", index=False)
+
+        loaded = MassSpecData.read_hdf(file_path, "run")
+
+        assert loaded.meta_df.equals(ms_data.meta_df)
+        np.testing.assert_array_equal(loaded.get_frame(3).ab, ms_data.get_frame(3).ab)
+
+    def test_write_open_mmap(self, tmp_path):
+        ms_data, _ = _make_ms_data()
+        ms_data.write_mmap(tmp_path / "run")
+
+        loaded = MassSpecData.open_mmap(tmp_path / "run")
+
+        assert loaded.run_name == "run"
+        assert isinstance(loaded.peaks.mz, np.memmap)
+        assert loaded.meta_df.equals(ms_data.meta_df)
+        np.testing.assert_array_equal(loaded.get_frame(3).ab, ms_data.get_frame(3).ab)
+
+
+class TestPeakArray:
+
+    def test_allocate(self):
+        peaks = PeakArray.allocate(4)
+
+        assert len(peaks) == 4
+        assert peaks.mz.flags.c_contiguous and peaks.ab.flags.c_contiguous
+        assert peaks.mz.base is peaks.ab.base
+        assert len(PeakArray.allocate(0)) == 0
+
+
+class TestPackPeaks:
+
+    def test_pack_peaks(self):
+        mz = np.array([100.0, 200.0, 300.0, 400.0])
+        ab = np.array([5.0, 0.0, 7.0, 0.0])
+        out = PeakArray.allocate(4)
+
+        n = pack_peaks(mz, ab, out.mz, out.ab)
+
+        assert n == 2
+        assert out.mz[:n].tolist() == [100.0, 300.0]
+        assert out.ab[:n].tolist() == [5.0, 7.0]
+        assert pack_peaks(mz, ab, out.mz, out.ab, 6.0) == 1
+
+
+class TestDotNetArrayView:
+
+    def test_buffer_protocol(self):
+        # stands in for a pythonnet >= 3 double[], which exports a buffer
+        src = array("d", [1.5, 0.0, 2.5])
+
+        view = DotNetArrayView(src)
+        assert view.dtype == np.float64
+        assert view.tolist() == [1.5, 0.0, 2.5]
+        src[0] = 3.0
+        assert view[0] == 3.0
+
+        dest = np.empty(3, dtype=np.float32)
+        DotNetArrayCopyTo(src, dest)
+        assert dest.tolist() == [3.0, 0.0, 2.5]
+        assert DotNetArrayView(None).size == 0
+
+
+class TestPeakArrayBuilder:
+
+    def test_build(self):
+        list_of_peaks = _make_peaks((3, 0, 5, 1, 4))
+        builder = PeakArrayBuilder(capacity=2)
+        for peaks in list_of_peaks:
+            builder.append(peaks)
+
+        peaks, peak_start, peak_stop = builder.build()
+
+        assert len(peaks) == 13
+        assert peaks.mz.dtype == np.float32
+        assert peak_start.tolist() == [0, 3, 3, 8, 9]
+        assert peak_stop.tolist() == [3, 3, 8, 9, 13]
+        np.testing.assert_array_equal(
+            peaks.mz, np.concatenate([p.mz for p in list_of_peaks])
+        )
+
+    def test_reserve_commit(self):
+        builder = PeakArrayBuilder(capacity=1)
+        out = builder.reserve(4)
+        out.mz[:] = [1, 2, 3, 4]
+        out.ab[:] = [0, 5, 0, 6]
+        builder.commit(2)
+
+        peaks, peak_start, peak_stop = builder.build()
+
+        assert peaks.mz.tolist() == [1, 2]
+        assert peak_stop.tolist() == [2]
+
+    def test_from_builder(self):
+        list_of_peaks = _make_peaks((3, 0, 5))
+        builder = PeakArrayBuilder()
+        for peaks in list_of_peaks:
+            builder.append(peaks)
+
+        ms_data = MassSpecData.from_builder("run", _make_meta_df([1, 2, 3]), builder)
+        expected = MassSpecData.create("run", _make_meta_df([1, 2, 3]), list_of_peaks)
+
+        assert ms_data.meta_df.equals(expected.meta_df)
+        np.testing.assert_array_equal(ms_data.peaks.ab, expected.peaks.ab)
+
+    def test_extend(self):
+        list_of_peaks = _make_peaks((3, 0, 5, 1))
+        builder = PeakArrayBuilder(capacity=1)
+        builder.append(list_of_peaks[0])
+        builder.extend(
+            PeakArray(
+                np.concatenate([p.mz for p in list_of_peaks[1:]]),
+                np.concatenate([p.ab for p in list_of_peaks[1:]]),
+            ),
+            np.array([0, 5, 1]),
+        )
+
+        peaks, peak_start, peak_stop = builder.build()
+
+        assert builder.num_frames == 4
+        assert peak_stop.tolist() == [3, 3, 8, 9]
+        np.testing.assert_array_equal(
+            peaks.ab, np.concatenate([p.ab for p in list_of_peaks])
+        )
+
+
+class TestPeakBufferPool:
+
+    def test_acquire_release(self):
+        pool = PeakBufferPool()
+        arr = pool.acquire(5)
+
+        assert arr.shape == (5,) and arr.base.size == 8
+        pool.release(arr)
+        assert pool.num_bytes == 32
+        assert pool.acquire(7).base is arr.base
+        assert pool.num_bytes == 0
+
+    def test_max_bytes(self):
+        pool = PeakBufferPool(max_bytes=64)
+        for n in (8, 16, 4):
+            pool.release(pool.acquire(n))
+
+        # over budget: the least recently released sizes were dropped
+        assert pool.num_bytes == 16
+
+    @staticmethod
+    def _pooled_ms_data(monkeypatch, list_of_peaks):
+        pool = PeakBufferPool()
+        monkeypatch.setenv(ms_data_module.ENV_POOL, "1")
+        monkeypatch.setattr(ms_data_module, "_PEAK_BUFFER_POOL", pool)
+        builder = PeakArrayBuilder(capacity=2)
+        for peaks in list_of_peaks:
+            builder.append(peaks)
+        pool.clear()  # drop the buffers outgrown while building
+        frame_nums = list(range(1, len(list_of_peaks) + 1))
+        return pool, MassSpecData.from_builder(
+            "run", _make_meta_df(frame_nums), builder
+        )
+
+    def test_pool_env_read_lazily(self, monkeypatch):
+        monkeypatch.setattr(ms_data_module, "_PEAK_BUFFER_POOL", None)
+        monkeypatch.delenv(ms_data_module.ENV_POOL, raising=False)
+        assert ms_data_module.get_peak_buffer_pool() is None
+
+        monkeypatch.setenv(ms_data_module.ENV_POOL, "1")
+        pool = ms_data_module.get_peak_buffer_pool()
+        assert isinstance(pool, PeakBufferPool)
+        assert ms_data_module.get_peak_buffer_pool() is pool
+
+    def test_pool_needs_exact_refcounts(self, monkeypatch):
+        monkeypatch.setenv(ms_data_module.ENV_POOL, "1")
+        monkeypatch.setattr(ms_data_module, "_EXACT_REFCOUNTS", False)
+        assert ms_data_module.get_peak_buffer_pool() is None
+
+    def test_from_builder_close(self, monkeypatch):
+        list_of_peaks = _make_peaks((3, 0, 5))
+        pool, ms_data = self._pooled_ms_data(monkeypatch, list_of_peaks)
+
+        with ms_data:
+            np.testing.assert_array_equal(ms_data.get_frame(3).mz, list_of_peaks[2].mz)
+
+        assert len(ms_data.peaks) == 0
+        assert pool.num_bytes == 2 * 8 * 4
+
+    def test_close_keeps_referenced_buffers(self, monkeypatch):
+        list_of_peaks = _make_peaks((3, 0, 5))
+        pool, ms_data = self._pooled_ms_data(monkeypatch, list_of_peaks)
+        frame = ms_data.get_frame(3)
+        ab_view = memoryview(ms_data.peaks.ab)
+
+        ms_data.close()
+
+        # both buffers are still in use, so neither went back to the pool
+        assert pool.num_bytes == 0
+        pool.acquire(8)[:] = -1
+        np.testing.assert_array_equal(frame.mz, list_of_peaks[2].mz)
+        np.testing.assert_array_equal(np.asarray(ab_view)[3:], list_of_peaks[2].ab)
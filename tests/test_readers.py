@@ -1,9 +1,11 @@
+import base64
+
 import numpy as np
 import polars as pl
+import pytest
 
 from pymsio.readers.ms_data import PeakArray
 
-
 # ---------------------------------------------------------------------------
 # Basic import / environment tests (always run, no file needed)
 # ---------------------------------------------------------------------------
@@ -48,6 +50,18 @@ class TestImports:
         assert ".mzml" in ReaderFactory.supported_file_extensions
 
 
+class TestRunName:
+
+    def test_extract_run_name(self):
+        from pymsio.readers.base import MassSpecFileReader
+
+        assert MassSpecFileReader.extract_run_name("dir/run1.raw") == "run1"
+        assert MassSpecFileReader.extract_run_name("run1.mzML") == "run1"
+        assert MassSpecFileReader.extract_run_name("run1.mzML.gz") == "run1"
+        assert MassSpecFileReader.extract_run_name("run1.mzml.tar.gz") == "run1"
+        assert MassSpecFileReader.extract_run_name("run1.txt") == "run1"
+
+
 def _validate_meta_df(meta_df: pl.DataFrame) -> None:
     """Common assertions for any reader's meta DataFrame."""
     assert isinstance(meta_df, pl.DataFrame)
@@ -60,26 +74,60 @@ def _validate_meta_df(meta_df: pl.DataFrame) -> None:
     assert (meta_df["ms_level"] >= 1).all(), "ms_level should be >= 1"
 
 
-def _validate_peaks(peaks: PeakArray) -> None:
-    """Common assertions for a single frame's peak array."""
+def _validate_peaks(peaks) -> None:
+    """
+    Common assertions for a frame's peak array, or for the
+    ``(PeakArray, offsets)`` slab returned by ``get_frames(as_list=False)``.
+    """
+    offsets = None
+    if not isinstance(peaks, PeakArray):
+        peaks, offsets = peaks
     assert isinstance(peaks, PeakArray)
     assert peaks.mz.dtype == np.float32
     assert peaks.ab.dtype == np.float32
     assert peaks.mz.ndim == 1
     assert peaks.ab.ndim == 1
     assert len(peaks.mz) == len(peaks.ab)
+    if offsets is not None:
+        assert offsets.dtype == np.int64
+        assert offsets[0] == 0 and offsets[-1] == len(peaks)
+        assert (np.diff(offsets) >= 0).all()
 
 
 def _validate_mass_spec_data(ms_data) -> None:
     """Common assertions for MassSpecData returned by load()."""
     assert ms_data is not None
     assert ms_data.meta_df.shape[0] > 0
-    assert isinstance(ms_data.peaks, PeakArray)
-    assert ms_data.peaks.mz.ndim == 1
-    assert ms_data.peaks.ab.ndim == 1
-    assert ms_data.peaks.mz.dtype == np.float32
-    assert ms_data.peaks.ab.dtype == np.float32
-    assert len(ms_data.peaks) == len(ms_data.peaks.mz)
+    offsets = np.zeros(ms_data.meta_df.shape[0] + 1, dtype=np.int64)
+    offsets[1:] = ms_data.meta_df["peak_stop"].to_numpy()
+    _validate_peaks((ms_data.peaks, offsets))
+
+
+class TestReaderSubclass:
+
+    def test_get_frame_override(self, tmp_path):
+        from pymsio.readers.base import MassSpecFileReader
+
+        class FrameReader(MassSpecFileReader):
+            # implements get_frame, as readers did before _read_frame existed
+            def get_meta_df(self):
+                raise NotImplementedError()
+
+            def get_frame(self, frame_num):
+                mz = np.full(frame_num, frame_num, dtype=np.float32)
+                return PeakArray(mz, mz.copy())
+
+            def load(self, progress=None):
+                raise NotImplementedError()
+
+        file_path = tmp_path / "run.raw"
+        file_path.touch()
+        reader = FrameReader(file_path)
+
+        assert [len(p) for p in reader.get_frames([2, 0, 3])] == [2, 0, 3]
+        peaks, offsets = reader.get_frames([2, 3], as_list=False)
+        assert offsets.tolist() == [0, 2, 5]
+        np.testing.assert_array_equal(peaks.mz, [2, 2, 3, 3, 3])
 
 
 # ---------------------------------------------------------------------------
@@ -105,6 +153,105 @@ class TestMzmlReader:
         peaks = reader.get_frame(first_frame)
         _validate_peaks(peaks)
 
+    @pytest.mark.parametrize("as_list", [True, False])
+    def test_get_frames(self, mzml_path, as_list):
+        from pymsio.readers.mzml import MzmlFileReader
+
+        reader = MzmlFileReader(mzml_path)
+        frame_nums = [2, 0, 2, 1]
+        result = reader.get_frames(frame_nums, as_list=as_list)
+        if as_list:
+            list_of_peaks = result
+        else:
+            _validate_peaks(result)
+            peaks, offsets = result
+            list_of_peaks = [
+                PeakArray(peaks.mz[st:ed], peaks.ab[st:ed])
+                for st, ed in zip(offsets[:-1], offsets[1:])
+            ]
+
+        assert len(list_of_peaks) == len(frame_nums)
+        for frame_num, peaks in zip(frame_nums, list_of_peaks):
+            _validate_peaks(peaks)
+            expected = reader.get_frame(frame_num)
+            np.testing.assert_array_equal(peaks.mz, expected.mz)
+            np.testing.assert_array_equal(peaks.ab, expected.ab)
+
+    def test_get_frames_slab_cache(self, mzml_path):
+        from pymsio.readers.mzml import MzmlFileReader
+
+        reader = MzmlFileReader(mzml_path)
+        reader.frame_cache_size = 8
+        peaks, offsets = reader.get_frames([0, 1, 2], as_list=False)
+        _validate_peaks((peaks, offsets))
+
+        # the caller's slab stays writeable; the cache holds copies, not views
+        assert peaks.mz.flags.writeable
+        cached = reader.get_frame(1)
+        assert not np.shares_memory(cached.mz, peaks.mz)
+        np.testing.assert_array_equal(cached.mz, peaks.mz[offsets[1] : offsets[2]])
+
+    def test_get_frame_matches_load(self, mzml_path):
+        from pymsio.readers.mzml import MzmlFileReader
+
+        reader = MzmlFileReader(mzml_path)
+        ms_data = MzmlFileReader(mzml_path).load()
+        for frame_num in ms_data.meta_df["frame_num"].tail(5).to_list():
+            peaks = reader.get_frame(frame_num)
+            np.testing.assert_array_equal(peaks.mz, ms_data.get_frame(frame_num).mz)
+            np.testing.assert_array_equal(peaks.ab, ms_data.get_frame(frame_num).ab)
+
+    def test_stale_index_falls_back_to_streaming(self, mzml_path):
+        from pymsio.readers.mzml import MzmlFileReader
+
+        reader = MzmlFileReader(mzml_path)
+        offsets = reader._get_spectrum_offsets()
+        if offsets is None:
+            pytest.skip("no spectrum offsets for this file")
+        with open(mzml_path, "rb") as f:
+            spectrum_list = f.read().find(b"<spectrumList")
+        expected = MzmlFileReader(mzml_path).get_frames([1, 2])
+
+        # offsets that point at <spectrumList ...> instead of a <spectrum>
+        for as_list in (True, False):
+            reader._spectrum_offsets = np.full_like(offsets, spectrum_list)
+            result = reader.get_frames([1, 2], as_list=as_list)
+            if not as_list:
+                peaks, bounds = result
+                result = [
+                    PeakArray(peaks.mz[st:ed], peaks.ab[st:ed])
+                    for st, ed in zip(bounds[:-1], bounds[1:])
+                ]
+            for peaks, exp in zip(result, expected):
+                np.testing.assert_array_equal(peaks.mz, exp.mz)
+            assert reader._spectrum_offsets is None
+
+        reader._spectrum_offsets = np.full_like(offsets, spectrum_list)
+        np.testing.assert_array_equal(reader.get_frame(2).ab, expected[1].ab)
+
+    def test_frame_cache(self, mzml_path):
+        from pymsio.readers.mzml import MzmlFileReader
+
+        reader = MzmlFileReader(mzml_path)
+        assert reader.get_frame(1).mz.flags.writeable
+        assert reader.cache_info().currsize == 0
+
+        reader.frame_cache_size = 8
+        reader.clear_cache()
+        peaks = reader.get_frame(1)
+        assert reader.get_frames([1, 0, 1])[0] is peaks
+        assert not peaks.mz.flags.writeable
+
+        info = reader.cache_info()
+        assert (info.hits, info.misses, info.currsize) == (2, 2, 2)
+
+        reader.clear_cache()
+        assert reader.cache_info().currsize == 0
+        assert reader.get_frame(1) is not peaks
+
+        reader._cache_put(-1, PeakArray.empty())
+        assert PeakArray.empty().mz.flags.writeable
+
     def test_load(self, mzml_path):
         from pymsio.readers.mzml import MzmlFileReader
 
@@ -113,6 +260,30 @@ class TestMzmlReader:
         _validate_mass_spec_data(ms_data)
 
 
+class TestBinaryDecode:
+
+    def test_zstd(self):
+        zstandard = pytest.importorskip("zstandard")
+        from pymsio.readers.mzml import binary_decode
+
+        arr = np.arange(5, dtype=np.float64)
+        # frames without a content size need the expected length
+        cctx = zstandard.ZstdCompressor(write_content_size=False)
+        text = base64.b64encode(cctx.compress(arr.tobytes())).decode()
+
+        np.testing.assert_array_equal(binary_decode(text, 64, "zstd", len(arr)), arr)
+        # without defaultArrayLength the frame is stream-decompressed
+        np.testing.assert_array_equal(binary_decode(text, 64, "zstd"), arr)
+
+    def test_corrupt_payload_is_logged(self, caplog):
+        from pymsio.readers.mzml import binary_decode
+
+        text = base64.b64encode(b"not zlib data").decode()
+        with caplog.at_level("WARNING", logger="pymsio.readers.mzml"):
+            assert binary_decode(text, 32, "zlib").size == 0
+        assert "failed to decode zlib" in caplog.text
+
+
 # ---------------------------------------------------------------------------
 # Thermo RAW reader tests
 # ---------------------------------------------------------------------------
@@ -144,3 +315,96 @@ class TestThermoReader:
         ms_data = reader.load()
         _validate_mass_spec_data(ms_data)
         reader.close()
+
+
+class TestThermoParallelMerge:
+    """Chunked parallel load with an in-process fake worker (no .NET needed)."""
+
+    @staticmethod
+    def _fake_reader(monkeypatch, first, last, num_workers=2):
+        from concurrent.futures import ThreadPoolExecutor
+        from types import SimpleNamespace
+
+        import pymsio.readers.thermo as thermo
+
+        seen = []
+
+        def fake_worker(scan_range, need_meta, centroid_flags=None):
+            a, b = scan_range
+            seen.append((scan_range, centroid_flags))
+            frame_nums = np.arange(a, b + 1)
+            # scan ``fn`` carries ``fn % 3`` peaks, all at m/z ``fn``
+            counts = (frame_nums % 3).astype(np.int64)
+            mz = np.repeat(frame_nums, counts).astype(np.float32)
+            cols = {"frame_num": frame_nums.astype(np.uint32)} if need_meta else None
+            return cols, mz, mz.copy(), counts
+
+        monkeypatch.setattr(thermo, "_read_scan_range_worker", fake_worker)
+        monkeypatch.setattr(
+            thermo,
+            "ProcessPoolExecutor",
+            lambda max_workers, **kwargs: ThreadPoolExecutor(max_workers),
+        )
+
+        reader = thermo.ThermoRawReader.__new__(thermo.ThermoRawReader)
+        header = SimpleNamespace(FirstSpectrum=first, LastSpectrum=last)
+        reader._raw = SimpleNamespace(RunHeaderEx=header)
+        reader.filepath = "fake.raw"
+        reader.num_workers = num_workers
+        reader._first_scan = first
+        reader._centroid_flags = None
+        return reader, seen
+
+    def test_chunks_merge_in_order(self, monkeypatch):
+        reader, seen = self._fake_reader(monkeypatch, 5, 41)
+
+        class Counter:
+            n = 0
+
+            def update(self, n):
+                self.n += n
+
+        progress = Counter()
+        cols, builder = reader._read_scan_range_parallel(True, progress=progress)
+
+        ranges = sorted(r for r, _ in seen)
+        assert len(ranges) == 8
+        assert ranges[0][0] == 5 and ranges[-1][1] == 41
+        assert all(a[1] + 1 == b[0] for a, b in zip(ranges[:-1], ranges[1:]))
+
+        frame_nums = np.arange(5, 42)
+        np.testing.assert_array_equal(cols["frame_num"], frame_nums)
+        peaks, peak_start, peak_stop = builder.build()
+        np.testing.assert_array_equal(peak_stop - peak_start, frame_nums % 3)
+        np.testing.assert_array_equal(peaks.mz, np.repeat(frame_nums, frame_nums % 3))
+        assert progress.n == len(frame_nums)
+
+    def test_centroid_flags_passed_to_workers(self, monkeypatch):
+        reader, seen = self._fake_reader(monkeypatch, 1, 10)
+        reader._centroid_flags = np.arange(10) % 2 == 0
+
+        cols, _ = reader._read_scan_range_parallel(False)
+
+        assert cols is None
+        for (a, b), flags in seen:
+            np.testing.assert_array_equal(flags, reader._centroid_flags[a - 1 : b])
+
+    def test_is_centroid_out_of_range(self, monkeypatch):
+        reader, _ = self._fake_reader(monkeypatch, 5, 7)
+        reader._centroid_flags = np.array([True, True, False])
+        reader._raw.IsCentroidScanFromScanNumber = lambda frame_num: frame_num == 4
+
+        assert [reader._is_centroid(fn) for fn in (5, 7)] == [True, False]
+        # outside the flags: ask the file instead of wrapping around
+        assert reader._is_centroid(4) is True
+        assert reader._is_centroid(8) is False
+
+    def test_empty_range(self, monkeypatch):
+        reader, seen = self._fake_reader(monkeypatch, 1, 0)
+        reader._read_scan_events = lambda first, last: []
+
+        cols, builder = reader._read_scan_range_parallel(True)
+
+        assert not seen
+        assert len(cols["frame_num"]) == 0
+        assert len(builder.build()[0]) == 0